@@ -1,23 +1,249 @@
-from asyncio import Event, Lock, Semaphore, create_task, gather, get_event_loop
-from concurrent.futures import ThreadPoolExecutor
-from functools import wraps
-from typing import Any, Awaitable, Callable, Coroutine, ParamSpec, TypeVar, cast
+import os
+from asyncio import (
+    FIRST_COMPLETED,
+    CancelledError,
+    Event,
+    Future,
+    Lock,
+    Semaphore,
+    create_task,
+    ensure_future,
+    gather,
+    get_running_loop,
+    wait,
+)
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial, wraps
+from importlib import import_module
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Iterable,
+    ParamSpec,
+    TypeVar,
+    cast,
+)
+
+from PyDrocsid.environment import PROCESS_POOL_SIZE, THREAD_POOL_SIZE
 
 
 T = TypeVar("T")
 P = ParamSpec("P")
 
-executor = ThreadPoolExecutor()
 
+class NamedExecutor:
+    """Executor with a fixed number of workers which keeps track of its queue depth."""
+
+    def __init__(self, name: str, max_workers: int, *, processes: bool = False):
+        """
+        :param name: the name of the executor
+        :param max_workers: the maximum number of worker threads or processes
+        :param processes: whether to use worker processes instead of threads
+        """
+
+        self.name = name
+        self.max_workers = max_workers
+        self.processes = processes
+        self._executor: Executor | None = None
+        self.in_flight: int = 0  # number of submitted calls which have not finished yet
+        self.completed: int = 0
+
+    @property
+    def executor(self) -> Executor:
+        # workers are created lazily, so importing this module does not spawn any processes
+        if self._executor is None:
+            if self.processes:
+                self._executor = ProcessPoolExecutor(self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    @property
+    def queued(self) -> int:
+        """Number of calls which are waiting for a free worker."""
+
+        return max(0, self.in_flight - self.max_workers)
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call a function in this executor and wait for the result."""
+
+        self.in_flight += 1
+        try:
+            return await get_running_loop().run_in_executor(self.executor, partial(func, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "completed": self.completed,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait)
+            self._executor = None
+
+
+executors: dict[str, NamedExecutor] = {}
+
+
+def create_executor(name: str, max_workers: int, *, processes: bool = False) -> NamedExecutor:
+    """
+    Create a named executor, e.g. to isolate slow blocking calls from the default io thread pool.
+
+    :param name: the name of the executor
+    :param max_workers: the maximum number of worker threads or processes
+    :param processes: whether to use worker processes instead of threads
+    """
+
+    executors[name] = out = NamedExecutor(name, max_workers, processes=processes)
+    return out
+
+
+# default executors for blocking io and cpu bound work
+create_executor("io", THREAD_POOL_SIZE or min(32, (os.cpu_count() or 1) + 4))
+create_executor("cpu", PROCESS_POOL_SIZE or os.cpu_count() or 1, processes=True)
+
+executor = executors["io"].executor
+
+
+def executor_stats() -> dict[str, dict[str, int]]:
+    """Return the queue depth metrics of all executors."""
+
+    return {name: ex.stats() for name, ex in executors.items()}
+
+
+def run_in_executor(name: str) -> Callable[[Callable[P, T]], Callable[P, Awaitable[T]]]:
+    """Decorator which runs a blocking function in the executor with the given name."""
+
+    def deco(func: Callable[P, T]) -> Callable[P, Awaitable[T]]:
+        @wraps(func)
+        async def inner(*args: P.args, **kwargs: P.kwargs) -> T:
+            return await executors[name].run(func, *args, **kwargs)
+
+        return inner
+
+    return deco
+
+
+def run_in_thread(func: Callable[P, T]) -> Callable[P, Awaitable[T]]:
+    """Decorator which runs a blocking function in the io thread pool."""
+
+    return run_in_executor("io")(func)
+
+
+# functions decorated with run_in_process (the decorated names refer to the async wrappers, which cannot be pickled)
+_process_functions: dict[str, Callable[..., Any]] = {}
+
+
+def _call_in_process(key: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+    if key not in _process_functions:
+        # worker processes import the module on demand, which registers the function again
+        import_module(key.split(":")[0])
+
+    return _process_functions[key](*args, **kwargs)
+
+
+def run_in_process(func: Callable[P, T]) -> Callable[P, Awaitable[T]]:
+    """
+    Decorator which runs a cpu bound function in the process pool, so it blocks neither the event loop nor the
+    io thread pool. The function must be defined at module level and its arguments and result must be picklable.
+    """
+
+    key = f"{func.__module__}:{func.__qualname__}"
+    _process_functions[key] = func
 
-def run_in_thread(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
     @wraps(func)
-    async def inner(*args: Any, **kwargs: Any) -> T:
-        return await get_event_loop().run_in_executor(executor, lambda: func(*args, **kwargs))
+    async def inner(*args: P.args, **kwargs: P.kwargs) -> T:
+        return cast(T, await executors["cpu"].run(_call_in_process, key, args, kwargs))
 
     return inner
 
 
+async def _aiter(items: Iterable[T] | AsyncIterable[T]) -> AsyncGenerator[T, None]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def stream_gather(
+    n: int,
+    items: Iterable[Awaitable[T]] | AsyncIterable[Awaitable[T]],
+    *,
+    ordered: bool = False,
+    return_exceptions: bool = False,
+) -> AsyncIterator[tuple[int, T | Exception]]:
+    """
+    Run awaitables with at most n of them running concurrently and yield their results as they are available.
+    The awaitables are pulled lazily from the iterable, so a generator of coroutines only creates n of them at a time.
+    If an awaitable raises an exception (and return_exceptions is False) or the iteration is stopped early,
+    all running awaitables are cancelled and the remaining ones are not started.
+
+    :param n: the maximum number of concurrent awaitables
+    :param items: an iterable or async iterable of the awaitables to run
+    :param ordered: whether to yield the results in the order of the awaitables instead of as they complete
+                    (at most n finished results are buffered while waiting for an earlier awaitable)
+    :param return_exceptions: whether to yield exceptions as results instead of raising them
+    :return: an async iterator of tuples containing the index of an awaitable and its result
+    """
+
+    iterator = _aiter(items)
+    running: dict[Future[T], int] = {}
+    buffered: dict[int, T | Exception] = {}
+    started = 0
+    next_index = 0
+    exhausted = False
+
+    try:
+        while True:
+            while not exhausted and len(running) < n and len(buffered) < n:
+                try:
+                    awaitable = await iterator.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+
+                running[ensure_future(awaitable)] = started
+                started += 1
+
+            if not running:
+                break
+
+            done, _ = await wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=running.__getitem__):
+                idx = running.pop(future)
+                exception = CancelledError() if future.cancelled() else future.exception()
+                if exception is not None and not return_exceptions:
+                    raise exception
+
+                result: T | Exception = cast(Exception, exception) if exception is not None else future.result()
+                if ordered:
+                    buffered[idx] = result
+                else:
+                    yield idx, result
+
+            while next_index in buffered:
+                yield next_index, buffered.pop(next_index)
+                next_index += 1
+    finally:
+        for future in running:
+            future.cancel()
+        await gather(*running, return_exceptions=True)
+        await iterator.aclose()
+
+
 async def semaphore_gather(n: int, *tasks: Awaitable[T]) -> list[T]:
     """
     Like asyncio.gather, but limited to n concurrent tasks.
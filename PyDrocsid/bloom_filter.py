@@ -0,0 +1,37 @@
+from hashlib import blake2b
+from math import ceil, log
+
+
+class BloomFilter:
+    """Probabilistic set membership: no false negatives, false positives with a configurable probability."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        :param capacity: expected number of elements
+        :param error_rate: false positive probability when the filter contains capacity elements
+        """
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size: int = max(8, ceil(-capacity * log(error_rate) / log(2) ** 2))  # number of bits
+        self.hashes: int = max(1, round(self.size / capacity * log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> list[int]:
+        # double hashing: h_i = h1 + i * h2
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def clear(self) -> None:
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Awaitable, Protocol
+
+
+class CachePubSub(Protocol):
+    """Pub/sub connection of a cache backend."""
+
+    async def subscribe(self, *channels: str) -> Any:
+        ...
+
+    async def unsubscribe(self, *channels: str) -> Any:
+        ...
+
+    async def psubscribe(self, *patterns: str) -> Any:
+        ...
+
+    async def punsubscribe(self, *patterns: str) -> Any:
+        ...
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0) -> dict[str, Any] | None:
+        ...
+
+    def listen(self) -> AsyncIterator[dict[str, Any]]:
+        ...
+
+    async def __aenter__(self) -> CachePubSub:
+        ...
+
+    async def __aexit__(self, *_: Any) -> None:
+        ...
+
+
+class CachePipeline(Protocol):
+    """Queue of cache commands which are sent in a single round trip. Command methods return the pipeline itself."""
+
+    def exists(self, *keys: str) -> CachePipeline:
+        ...
+
+    def delete(self, *keys: str) -> CachePipeline:
+        ...
+
+    def expire(self, key: str, seconds: float) -> CachePipeline:
+        ...
+
+    def ttl(self, key: str) -> CachePipeline:
+        ...
+
+    def get(self, key: str) -> CachePipeline:
+        ...
+
+    def set(
+        self, key: str, value: Any, ex: float | None = None, px: float | None = None, nx: bool = False
+    ) -> CachePipeline:
+        ...
+
+    def setex(self, key: str, seconds: float, value: Any) -> CachePipeline:
+        ...
+
+    def incrby(self, key: str, amount: int = 1) -> CachePipeline:
+        ...
+
+    def incr(self, key: str, amount: int = 1) -> CachePipeline:
+        ...
+
+    def lpush(self, key: str, *values: Any) -> CachePipeline:
+        ...
+
+    def rpush(self, key: str, *values: Any) -> CachePipeline:
+        ...
+
+    def lrange(self, key: str, start: int, end: int) -> CachePipeline:
+        ...
+
+    def llen(self, key: str) -> CachePipeline:
+        ...
+
+    def publish(self, channel: str, message: Any) -> CachePipeline:
+        ...
+
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        ...
+
+    def reset(self) -> Any:
+        ...
+
+    async def __aenter__(self) -> CachePipeline:
+        ...
+
+    async def __aexit__(self, *_: Any) -> None:
+        ...
+
+
+class CacheBackend(Protocol):
+    """
+    Subset of the redis api which is supported by all cache backends (strings, lists, ttl, pub/sub, pipelines).
+    Values are returned as strings (the redis client is created with decode_responses=True).
+    """
+
+    # keys
+
+    def exists(self, *keys: str) -> Awaitable[int]:
+        ...
+
+    def delete(self, *keys: str) -> Awaitable[int]:
+        ...
+
+    def expire(self, key: str, seconds: float) -> Awaitable[bool]:
+        ...
+
+    def ttl(self, key: str) -> Awaitable[int]:
+        ...
+
+    def scan_iter(self, match: str | None = None, count: int | None = None) -> AsyncIterator[str]:
+        ...
+
+    def keys(self, pattern: str = "*") -> Awaitable[list[str]]:
+        ...
+
+    def flushdb(self) -> Awaitable[bool]:
+        ...
+
+    # strings
+
+    def get(self, key: str) -> Awaitable[str | None]:
+        ...
+
+    def set(
+        self, key: str, value: Any, ex: float | None = None, px: float | None = None, nx: bool = False
+    ) -> Awaitable[bool | None]:
+        ...
+
+    def setex(self, key: str, seconds: float, value: Any) -> Awaitable[bool]:
+        ...
+
+    def incrby(self, key: str, amount: int = 1) -> Awaitable[int]:
+        ...
+
+    def incr(self, key: str, amount: int = 1) -> Awaitable[int]:
+        ...
+
+    # lists
+
+    def lpush(self, key: str, *values: Any) -> Awaitable[int]:
+        ...
+
+    def rpush(self, key: str, *values: Any) -> Awaitable[int]:
+        ...
+
+    def lrange(self, key: str, start: int, end: int) -> Awaitable[list[str]]:
+        ...
+
+    def llen(self, key: str) -> Awaitable[int]:
+        ...
+
+    # pub/sub
+
+    def publish(self, channel: str, message: Any) -> Awaitable[int]:
+        ...
+
+    def pubsub(self) -> CachePubSub:
+        ...
+
+    # client
+
+    def pipeline(self, transaction: bool = True) -> CachePipeline:
+        ...
+
+    def ping(self) -> Awaitable[bool]:
+        ...
+
+    def close(self) -> Awaitable[None]:
+        ...
@@ -1,18 +1,135 @@
 import asyncio
+from datetime import timedelta
+from time import time
 from typing import cast
 
-from discord import DMChannel, Forbidden, HTTPException, Message, NotFound, Thread
+from discord import (
+    DMChannel,
+    Forbidden,
+    HTTPException,
+    Message,
+    NotFound,
+    Object,
+    StageChannel,
+    TextChannel,
+    Thread,
+    VoiceChannel,
+)
 from discord.abc import GuildChannel, PrivateChannel, Snowflake
 from discord.ext.commands.bot import Bot
 from discord.ext.commands.context import Context
-
-from PyDrocsid.environment import RESPONSE_LINK_TTL
+from discord.utils import snowflake_time, utcnow
+
+from PyDrocsid.bloom_filter import BloomFilter
+from PyDrocsid.environment import (
+    RESPONSE_FILTER_CAPACITY,
+    RESPONSE_FILTER_GRACE_PERIOD,
+    RESPONSE_FILTER_REBUILD_INTERVAL,
+    RESPONSE_LINK_TTL,
+)
 from PyDrocsid.logger import get_logger
-from PyDrocsid.redis_client import redis
+from PyDrocsid.redis_client import cache, pipeline
 from PyDrocsid.types import GuildMessageable
 
 logger = get_logger(__name__)
 
+# pub/sub channel used to announce new response links to all nodes
+RESPONSE_LINK_CHANNEL = "pydrocsid:response_links"
+
+
+def _response_key(channel_id: int, message_id: int) -> str:
+    return f"bot_response:channel={channel_id},msg={message_id}"
+
+
+class ResponseLinkFilter:
+    """
+    Local bloom filter of all command messages which have linked bot responses, so that deleting any other message
+    does not require a redis request. The filter is rebuilt from a scan of the response link keys whenever the
+    pub/sub listener (re)connects and periodically afterwards, as bloom filters cannot forget expired links.
+    Links created on other nodes are announced via pub/sub. As long as the filter has not been built after the
+    listener (re)connected, and for messages which might have links whose announcement has not arrived yet, every
+    lookup falls back to redis.
+    """
+
+    def __init__(self, capacity: int, rebuild_interval: float, grace_period: float):
+        """
+        :param capacity: expected number of response links
+        :param rebuild_interval: number of seconds between two rebuilds
+        :param grace_period: number of seconds after the creation of a message during which lookups always fall back
+                             to redis, as links created on other nodes might not have been announced yet
+        """
+
+        self.capacity = capacity
+        self.rebuild_interval = rebuild_interval
+        self.grace_period = grace_period
+        self._filter = BloomFilter(capacity)
+        self._building: BloomFilter | None = None
+        self._ready = False
+        self._task: asyncio.Task[None] | None = None
+
+    def add(self, key: str) -> None:
+        self._filter.add(key)
+        if self._building:
+            self._building.add(key)
+
+    def might_have_responses(self, channel_id: int, message_id: int) -> bool:
+        """Return False if the given message definitely has no linked responses."""
+
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+        if not self._ready:
+            return True
+
+        # responses to recent messages might have been linked on another node without being announced here yet
+        if snowflake_time(message_id) > utcnow() - timedelta(seconds=self.grace_period):
+            return True
+
+        return _response_key(channel_id, message_id) in self._filter
+
+    async def rebuild(self) -> None:
+        """Rebuild the filter from the response link keys in redis."""
+
+        # links added during the scan are added to both filters
+        self._building = new = BloomFilter(self.capacity)
+        try:
+            async for key in cache.scan_iter(match="bot_response:*", count=1000):
+                new.add(key)
+            self._filter = new
+        finally:
+            self._building = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # the pubsub connection is released when the listener disconnects
+                async with cache.pubsub() as pubsub:
+                    await pubsub.subscribe(RESPONSE_LINK_CHANNEL)
+
+                    # links created during the rebuild are received via pub/sub afterwards
+                    await self.rebuild()
+                    rebuilt_at = time()
+                    self._ready = True
+
+                    while True:
+                        if message := await pubsub.get_message(ignore_subscribe_messages=True, timeout=1):
+                            self.add(message["data"])
+
+                        if time() - rebuilt_at >= self.rebuild_interval:
+                            await self.rebuild()
+                            rebuilt_at = time()
+            except Exception as e:  # noqa: B902
+                logger.warning("Response link filter disconnected: %s", e)
+            finally:
+                self._ready = False
+
+            await asyncio.sleep(1)
+
+
+response_filter = ResponseLinkFilter(
+    RESPONSE_FILTER_CAPACITY, RESPONSE_FILTER_REBUILD_INTERVAL, RESPONSE_FILTER_GRACE_PERIOD
+)
+
 
 async def link_response(msg: Message | Context[Bot], *response_messages: Message) -> None:
     """Create a link from message to a given list of bot responses and add it to redis."""
@@ -23,12 +140,17 @@ async def link_response(msg: Message | Context[Bot], *response_messages: Message
     if isinstance(msg, Context):
         msg = msg.message
 
-    # save channel:message pairs in redis
-    await redis.lpush(
-        key := f"bot_response:channel={msg.channel.id},msg={msg.id}",
-        *[f"{msg.channel.id}:{msg.id}" for msg in response_messages],
-    )
-    await redis.expire(key, RESPONSE_LINK_TTL)
+    # save response links in redis: responses in the same channel as the command message (which is the usual case)
+    # are stored as plain message ids, responses in other channels as channel:message pairs
+    async with pipeline() as pipe:
+        pipe.lpush(
+            key := _response_key(msg.channel.id, msg.id),
+            *[str(r.id) if r.channel.id == msg.channel.id else f"{r.channel.id}:{r.id}" for r in response_messages],
+        )
+        pipe.expire(key, RESPONSE_LINK_TTL)
+        pipe.publish(RESPONSE_LINK_CHANNEL, key)
+
+    response_filter.add(key)
 
 
 async def handle_edit(bot: Bot, message: Message) -> None:
@@ -53,21 +175,67 @@ async def _get_channel(bot: Bot, channel_id: int) -> GuildChannel | PrivateChann
         return None
 
 
-async def handle_delete(bot: Bot, channel_id: int, message_id: int) -> None:
-    """Delete linked bot responses of a command message."""
+def _parse_response_links(channel_id: int, responses: list[str]) -> dict[int, list[int]]:
+    """Group linked response message ids by channel id."""
+
+    out: dict[int, list[int]] = {}
+    for response in responses:
+        chn_id, _, msg_id = response.rpartition(":")
+        out.setdefault(int(chn_id or channel_id), []).append(int(msg_id))
+    return out
+
+
+async def _delete_messages(bot: Bot, channel_id: int, message_ids: list[int]) -> None:
+    """Delete messages without fetching them first, using bulk deletion where possible."""
+
+    chn = await _get_channel(bot, channel_id)
+    if not isinstance(chn, (TextChannel, VoiceChannel, StageChannel, Thread, DMChannel)):
+        logger.warning("could not delete messages %s in unknown channel %s", message_ids, channel_id)
+        return
 
-    responses = await redis.lrange(key := f"bot_response:channel={channel_id},msg={message_id}", 0, -1)
-    await redis.delete(key)
+    # bind the narrowed type, as narrowing does not apply inside the nested function below
+    channel: GuildMessageable | Thread | DMChannel = chn
 
-    async def delete_message(chn_id: int, msg_id: int) -> None:
-        if not isinstance(chn := await _get_channel(bot, chn_id), (GuildMessageable, Thread, DMChannel)):
-            logger.warning("could not delete message %s in unknown channel %s", msg_id, chn_id)
-            return
+    bulk: list[int] = []
+    single: list[int] = message_ids
+    if not isinstance(channel, DMChannel) and channel.permissions_for(channel.guild.me).manage_messages:
+        # bulk deletion is only allowed for messages younger than 14 days
+        min_time = utcnow() - timedelta(days=14) + timedelta(minutes=1)
+        bulk = [msg_id for msg_id in message_ids if snowflake_time(msg_id) > min_time]
+        single = [msg_id for msg_id in message_ids if msg_id not in bulk]
 
+    async def delete(*msg_ids: int) -> None:
         try:
-            message: Message = await chn.fetch_message(int(msg_id))
-            await message.delete()
+            if len(msg_ids) == 1:
+                # PartialMessage.delete is Message.delete, which pycord does not annotate for partial messages
+                await channel.get_partial_message(msg_ids[0]).delete()  # type: ignore[misc]
+            else:
+                # bulk is always empty in dm channels
+                await channel.delete_messages([Object(msg_id) for msg_id in msg_ids])  # type: ignore[union-attr]
         except (NotFound, Forbidden, HTTPException):
-            logger.warning("could not delete message %s in #%s (%s)", msg_id, chn.name, chn.id)
+            logger.warning(
+                "could not delete messages %s in #%s (%s)", msg_ids, getattr(channel, "name", None), channel.id
+            )
 
-    await asyncio.gather(*[delete_message(*map(int, r.split(":"))) for r in responses])
+    await asyncio.gather(
+        *[delete(*bulk[i : i + 100]) for i in range(0, len(bulk), 100)], *[delete(msg_id) for msg_id in single]
+    )
+
+
+async def handle_delete(bot: Bot, channel_id: int, message_id: int) -> None:
+    """Delete linked bot responses of a command message."""
+
+    # skip redis for messages which never produced any responses
+    if not response_filter.might_have_responses(channel_id, message_id):
+        return
+
+    key = _response_key(channel_id, message_id)
+    async with cache.pipeline() as pipe:
+        responses, _ = await pipe.lrange(key, 0, -1).delete(key).execute()
+
+    await asyncio.gather(
+        *[
+            _delete_messages(bot, chn_id, msg_ids)
+            for chn_id, msg_ids in _parse_response_links(channel_id, responses).items()
+        ]
+    )
@@ -7,7 +7,10 @@ from typing import AsyncIterator, Awaitable, Callable, ParamSpec, TypeVar
 from sqlalchemy.exc import OperationalError
 
 from .database import Base, UTCDateTime, delete, exists, filter_by, get_database, select
+from .retry import is_transient
+from .write_behind import WriteBehindBuffer
 from .. import logger
+from ..environment import WRITE_BEHIND_INTERVAL, WRITE_BEHIND_MAX_SIZE
 
 
 T = TypeVar("T")
@@ -36,15 +39,20 @@ def db_wrapper(f: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
 
     @wraps(f)
     async def inner(*args: P.args, **kwargs: P.kwargs) -> T:
-        async with db_context():
-            try:
-                return await f(*args, **kwargs)
-            except OperationalError as e:
-                if e.args and "1047," in e.args[0] or "1180," in e.args[0]:
-                    logger.get_logger("database").warning("Database not usable anymore (1047 or 1180)")
-                    os.kill(os.getpid(), signal.SIGTERM)
-                    exit(1)
-                raise
+        try:
+            async with db_context():
+                result = await f(*args, **kwargs)
+        except OperationalError as e:
+            if is_transient(e) and db.circuit_breaker.record_failure():
+                logger.get_logger("database").error(
+                    "Database not usable for more than %s seconds, shutting down: %s", db.circuit_breaker.timeout, e
+                )
+                os.kill(os.getpid(), signal.SIGTERM)
+                exit(1)
+            raise
+
+        db.circuit_breaker.record_success()
+        return result
 
     return inner
 
@@ -52,5 +60,19 @@ def db_wrapper(f: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
 # global database connection object
 db = get_database()
 
+# global write-behind buffer for frequent updates of the same rows
+write_behind = WriteBehindBuffer(db, flush_interval=WRITE_BEHIND_INTERVAL, max_size=WRITE_BEHIND_MAX_SIZE)
+
 
-__all__ = ["db_context", "db_wrapper", "select", "filter_by", "exists", "delete", "db", "Base", "UTCDateTime"]
+__all__ = [
+    "db_context",
+    "db_wrapper",
+    "select",
+    "filter_by",
+    "exists",
+    "delete",
+    "db",
+    "write_behind",
+    "Base",
+    "UTCDateTime",
+]
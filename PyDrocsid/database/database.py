@@ -1,14 +1,20 @@
-from asyncio import Event
+from asyncio import Event, Task, create_task, sleep
 from contextvars import ContextVar
 from datetime import datetime, timezone
-from functools import partial
-from typing import Any, AsyncIterator, NamedTuple, Type, TypeVar, cast
+from functools import lru_cache, partial
+from itertools import count as counter
+from math import inf
+from time import monotonic
+from typing import Any, AsyncIterator, Awaitable, Callable, NamedTuple, Type, TypeVar, cast
 
-from sqlalchemy import Column, DateTime, Table, TypeDecorator
+from sqlalchemy import Column, DateTime, Table, TypeDecorator, event, inspect
 from sqlalchemy.engine import URL
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.future import select as sa_select
-from sqlalchemy.orm import DeclarativeMeta, registry, selectinload
+from sqlalchemy.orm import DeclarativeMeta, QueryableAttribute
+from sqlalchemy.orm import Session as SyncSession
+from sqlalchemy.orm import registry, selectinload
 from sqlalchemy.sql import Executable
 from sqlalchemy.sql.expression import Delete
 from sqlalchemy.sql.expression import delete as sa_delete
@@ -16,12 +22,24 @@ from sqlalchemy.sql.expression import exists as sa_exists
 from sqlalchemy.sql.functions import count
 from sqlalchemy.sql.selectable import Exists, Select
 
+from .metrics import DatabaseMetrics, InstrumentedQueuePool
+from .retry import NODE_ERROR_CODES, CircuitBreaker, RetryPolicy, get_error_code, is_transient
 from ..environment import (
     DB_DATABASE,
     DB_DRIVER,
     DB_HOST,
+    DB_METRICS,
+    DB_METRICS_LOG_INTERVAL,
     DB_PASSWORD,
     DB_PORT,
+    DB_REPLICA_CHECK_INTERVAL,
+    DB_REPLICA_HOSTS,
+    DB_REPLICA_MAX_LAG,
+    DB_RETRY_ATTEMPTS,
+    DB_RETRY_BASE_DELAY,
+    DB_RETRY_MAX_DELAY,
+    DB_SHUTDOWN_AFTER,
+    DB_SLOW_QUERY_LOG_SIZE,
     DB_USERNAME,
     MAX_OVERFLOW,
     POOL_RECYCLE,
@@ -39,31 +57,63 @@ logger = get_logger(__name__)
 class Session(NamedTuple):
     session: AsyncSession
     close_event: Event
+    created_at: float
+    parent: Any  # next session on the stack (Session | None, mypy does not support recursive named tuples)
 
 
-_sessions: ContextVar[list[Session]] = ContextVar("sessions", default=[])
+# immutable linked stack of sessions: pushing and popping is O(1) and never affects
+# the stacks of other contexts (e.g. tasks that have been spawned inside a db_context)
+_sessions: ContextVar[Session | None] = ContextVar("sessions", default=None)
 
+# session info key which routes all reads of a session to the primary database
+PIN_PRIMARY = "pydrocsid_pin_primary"
 
-def select(entity: Any, *args: Column[Any]) -> Select:
-    """Shortcut for :meth:`sqlalchemy.future.select`"""
 
-    if not args:
+def _pin_primary_after_flush(session: SyncSession, _: Any) -> None:
+    # read your own writes: replicas might not have received the flushed changes yet
+    session.info[PIN_PRIMARY] = True
+
+
+event.listen(SyncSession, "after_flush", _pin_primary_after_flush)
+
+
+def _normalize_load_path(arg: Any) -> Any:
+    return tuple(arg) if isinstance(arg, (tuple, list)) else arg
+
+
+@lru_cache(maxsize=1024)
+def _cached_select(entity: Any, *paths: Any) -> Select:
+    """
+    Build (and memoize) a select statement with selectinload options for the given relationship paths.
+    Select objects are immutable, so the same statement can safely be shared between all callers.
+    """
+
+    if not paths:
         return sa_select(entity)
 
     options = []
-    for arg in args:
-        if isinstance(arg, (tuple, list)):
-            head, *tail = arg
+    for path in paths:
+        if isinstance(path, tuple):
+            head, *tail = path
             opt = selectinload(head)
             for x in tail:
                 opt = opt.selectinload(x)
             options.append(opt)
         else:
-            options.append(selectinload(arg))
+            options.append(selectinload(path))
 
     return sa_select(entity).options(*options)
 
 
+def select(entity: Any, *args: Column[Any]) -> Select:
+    """Shortcut for :meth:`sqlalchemy.future.select`"""
+
+    try:
+        return _cached_select(entity, *map(_normalize_load_path, args))
+    except TypeError:  # unhashable entity or relationship path
+        return _cached_select.__wrapped__(entity, *map(_normalize_load_path, args))
+
+
 def filter_by(cls: Any, *args: Column[Any], **kwargs: Any) -> Select:
     """Shortcut for :meth:`sqlalchemy.future.Select.filter_by`"""
 
@@ -110,6 +160,54 @@ class Base(metaclass=DeclarativeMeta):
         self.registry.constructor(self, **kwargs)
 
 
+class Replica:
+    """A read replica of the primary database and its most recently measured replication lag."""
+
+    def __init__(self, engine: AsyncEngine, metrics: DatabaseMetrics | None = None):
+        self.engine: AsyncEngine = engine
+        self.metrics: DatabaseMetrics | None = metrics
+        self.lag: float = inf
+        self.checked_at: float = -inf
+
+    async def check_lag(self) -> float:
+        """Measure the replication lag (in seconds) of this replica."""
+
+        async with self.engine.connect() as conn:
+            if self.engine.dialect.name in ("mysql", "mariadb"):
+                status = (await conn.exec_driver_sql("SHOW SLAVE STATUS")).mappings().first()
+                if status is None:
+                    # not an asynchronous replica (e.g. a galera cluster node)
+                    return 0
+
+                lag = status.get("Seconds_Behind_Master")
+                return inf if lag is None else float(lag)
+
+            if self.engine.dialect.name == "postgresql":
+                lag = (
+                    await conn.exec_driver_sql(
+                        "SELECT CASE WHEN pg_is_in_recovery() "
+                        "THEN EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) ELSE 0 END"
+                    )
+                ).scalar()
+                return inf if lag is None else float(lag)
+
+        return 0
+
+    async def refresh(self, interval: float) -> None:
+        """Update the replication lag if the last check is older than the given interval."""
+
+        if monotonic() - self.checked_at < interval:
+            return
+
+        # set timestamp first to prevent concurrent checks
+        self.checked_at = monotonic()
+        try:
+            self.lag = await self.check_lag()
+        except Exception as e:  # noqa: B902
+            logger.warning("Could not check replication lag of %s: %s", self.engine.url.host, e)
+            self.lag = inf
+
+
 class DB:
     def __init__(
         self,
@@ -123,6 +221,14 @@ class DB:
         pool_size: int = 20,
         max_overflow: int = 20,
         echo: bool = False,
+        replicas: list[tuple[str, int]] | None = None,
+        replica_max_lag: float = 5,
+        replica_check_interval: float = 10,
+        metrics: bool = True,
+        metrics_log_interval: float = 0,
+        slow_query_log_size: int = 10,
+        retry_policy: RetryPolicy | None = None,
+        shutdown_after: float = 60,
     ):
         """
         :param driver: name of the sql connection driver
@@ -132,18 +238,44 @@ class DB:
         :param username: name of the sql user
         :param password: password of the sql user
         :param echo: whether sql queries should be logged
+        :param replicas: list of (host, port) pairs of read replicas
+        :param replica_max_lag: maximum replication lag (in seconds) of a replica to still be used for reads
+        :param replica_check_interval: number of seconds after which the replication lag is measured again
+        :param metrics: whether to collect pool, session and query metrics
+        :param metrics_log_interval: interval (in seconds) for logging a metrics summary (0 to disable)
+        :param slow_query_log_size: number of slowest queries to keep in the metrics
+        :param retry_policy: retry policy for read only statements which failed with a transient error
+        :param shutdown_after: number of seconds of persistent database errors after which the bot is shut down
         """
 
-        self.engine: AsyncEngine = create_async_engine(
-            URL.create(
-                drivername=driver, username=username, password=password, host=host, port=port, database=database
-            ),
-            pool_pre_ping=True,
-            pool_recycle=pool_recycle,
-            pool_size=pool_size,
-            max_overflow=max_overflow,
-            echo=echo,
-        )
+        def create_engine(h: str, p: int) -> tuple[AsyncEngine, DatabaseMetrics | None]:
+            engine = create_async_engine(
+                URL.create(drivername=driver, username=username, password=password, host=h, port=p, database=database),
+                pool_pre_ping=True,
+                pool_recycle=pool_recycle,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                echo=echo,
+                **({"poolclass": InstrumentedQueuePool} if metrics else {}),
+            )
+            if not metrics:
+                return engine, None
+
+            engine_metrics = DatabaseMetrics(slow_query_log_size)
+            engine_metrics.instrument(engine)
+            return engine, engine_metrics
+
+        self.engine: AsyncEngine
+        self.metrics: DatabaseMetrics | None
+        self.engine, self.metrics = create_engine(host, port)
+        self.replicas: list[Replica] = [Replica(*create_engine(h, p)) for h, p in replicas or []]
+        self.replica_max_lag: float = replica_max_lag
+        self.replica_check_interval: float = replica_check_interval
+        self._replica_counter = counter()
+        self.metrics_log_interval: float = metrics_log_interval
+        self._metrics_task: Task[None] | None = None
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy()
+        self.circuit_breaker: CircuitBreaker = CircuitBreaker(shutdown_after)
 
     async def create_tables(self) -> None:
         """Create all tables defined in enabled cog packages."""
@@ -180,22 +312,158 @@ class DB:
     async def exec(self, statement: Executable) -> Any:
         """Execute an sql statement and return the result."""
 
+        if not getattr(statement, "is_select", False):
+            # read your own writes: core statements (e.g. update or delete) don't trigger the after_flush event
+            self.use_primary()
         return await self.session.execute(statement)
 
+    def use_primary(self) -> None:
+        """Route all following reads of the current session to the primary database."""
+
+        self.session.sync_session.info[PIN_PRIMARY] = True
+
+    async def _get_read_bind(self) -> AsyncEngine:
+        """Select the engine for a read only statement: a replica with acceptable lag or the primary."""
+
+        session = self.session
+        if not self.replicas or session.sync_session.info.get(PIN_PRIMARY):
+            return self.engine
+        if session.new or session.dirty or session.deleted:
+            # pending changes are flushed before the statement is executed
+            return self.engine
+
+        start = next(self._replica_counter)
+        for i in range(len(self.replicas)):
+            replica = self.replicas[(start + i) % len(self.replicas)]
+            await replica.refresh(self.replica_check_interval)
+            if replica.lag <= self.replica_max_lag:
+                return replica.engine
+
+        logger.debug("No replica available, falling back to primary database")
+        return self.engine
+
+    def _can_retry(self) -> bool:
+        """
+        Return whether a failed read can be retried: the session must not contain any objects or changes,
+        as the rollback after a connection error would discard or expire them.
+        """
+
+        session = self.session
+        return not (
+            session.sync_session.info.get(PIN_PRIMARY)
+            or session.sync_session.identity_map
+            or session.new
+            or session.dirty
+            or session.deleted
+        )
+
+    async def _handle_read_error(self, engine: AsyncEngine, error: OperationalError) -> None:
+        """Reset the session and take the failed database out of rotation if it is not usable."""
+
+        await self.session.rollback()
+
+        for replica in self.replicas:
+            if replica.engine is engine:
+                replica.lag = inf
+                replica.checked_at = monotonic()
+                return
+
+        if get_error_code(error) in NODE_ERROR_CODES:
+            # drop all idle connections to the unusable node
+            await engine.dispose()
+
+    async def _retry_read(self, func: Callable[[AsyncEngine], Awaitable[T]]) -> T:
+        """Execute a read only operation and retry it with backoff if it fails with a transient error."""
+
+        attempt = 0
+        while True:
+            engine = await self._get_read_bind()
+            can_retry = self._can_retry()
+            try:
+                return await func(engine)
+            except OperationalError as e:
+                if not can_retry or attempt >= self.retry_policy.attempts or not is_transient(e):
+                    raise
+
+                logger.warning("Transient database error, retrying (attempt %s): %s", attempt + 1, e)
+                await self._handle_read_error(engine, e)
+
+            await sleep(self.retry_policy.delay(attempt))
+            attempt += 1
+
+    async def _exec_read(self, statement: Executable) -> Any:
+        async def execute(engine: AsyncEngine) -> Any:
+            return await self.session.execute(statement, bind_arguments={"bind": engine.sync_engine})
+
+        return await self._retry_read(execute)
+
     async def stream(self, statement: Executable) -> AsyncIterator[Any]:
         """Execute an sql statement and stream the result."""
 
-        return cast(AsyncIterator[Any], (await self.session.stream(statement)).scalars())
+        async def execute(engine: AsyncEngine) -> Any:
+            return await self.session.stream(statement, bind_arguments={"bind": engine.sync_engine})
+
+        return cast(AsyncIterator[Any], (await self._retry_read(execute)).scalars())
 
     async def all(self, statement: Executable) -> list[Any]:
         """Execute an sql statement and return all results as a list."""
 
         return [x async for x in await self.stream(statement)]
 
+    async def iter_batches(
+        self, statement: Select, batch_size: int = 1000, order_by: Column[Any] | None = None
+    ) -> AsyncIterator[list[Any]]:
+        """
+        Iterate over the results of a select statement in batches using keyset pagination.
+
+        Each batch is fetched with a separate query (``WHERE order_by > last_key ORDER BY order_by LIMIT batch_size``)
+        using a server side cursor. Once the caller has processed a batch, pending changes are flushed and the
+        objects of this batch are expunged from the session, so memory usage stays bounded for large tables.
+
+        :param statement: the select statement (any existing ordering or limit is replaced)
+        :param batch_size: the maximum number of rows per batch
+        :param order_by: a unique column to paginate by (defaults to the primary key of the selected entity)
+        :return: an async iterator over lists of results
+        """
+
+        entity = statement.column_descriptions[0]["entity"]
+        if entity is None:
+            raise ValueError("iter_batches requires a select statement of a mapped entity")
+
+        if order_by is None:
+            if len(primary_key := inspect(entity).primary_key) != 1:
+                raise ValueError("order_by is required for entities without a single column primary key")
+            order_by = primary_key[0]
+
+        # the attribute name of a mapped column might differ from the column name
+        key: str = (
+            order_by.key
+            if isinstance(order_by, QueryableAttribute)
+            else inspect(entity).get_property_by_column(order_by).key
+        )
+        statement = statement.order_by(None).limit(None).order_by(order_by).limit(batch_size)
+        last: Any = None
+        while True:
+            stmt = statement if last is None else statement.where(order_by > last)
+            result = await self.session.stream(stmt.execution_options(yield_per=batch_size))
+            batch = [x async for x in result.scalars()]
+            if not batch:
+                return
+
+            last = getattr(batch[-1], key)
+            yield batch
+
+            await self.session.flush()
+            for obj in batch:
+                self.session.expunge(obj)
+
+            if len(batch) < batch_size:
+                return
+
     async def first(self, statement: Executable) -> Any | None:
         """Execute an sql statement and return the first result."""
 
-        return (await self.exec(statement)).scalar()
+        return (await self._exec_read(statement)).scalar()
 
     async def exists(self, statement: Executable, *args: Column[Any], **kwargs: Any) -> bool:
         """Execute an sql statement and return whether it returned at least one row."""
@@ -205,47 +473,81 @@ class DB:
     async def count(self, statement: Executable, *args: Column[Any]) -> int:
         """Execute an sql statement and return the number of returned rows."""
 
-        return cast(int, await self.first(select(count()).select_from(statement, *args)))
+        return cast(int, await self.first(sa_select(count()).select_from(statement, *args)))
 
     async def get(self, cls: Type[T], *args: Column[Any], **kwargs: Any) -> T | None:
-        """Shortcut for first(filter_by(...))"""
+        """
+        Shortcut for first(filter_by(...))
+
+        Rows returned by this method are usually modified afterwards, so it always reads from the primary database.
+        """
 
-        return await self.first(filter_by(cls, *args, **kwargs))
+        return cast(T | None, (await self.exec(filter_by(cls, *args, **kwargs))).scalar())
 
     async def commit(self) -> None:
         """Shortcut for :meth:`sqlalchemy.ext.asyncio.AsyncSession.commit`"""
 
-        if sessions := _sessions.get():
-            await sessions[-1].session.commit()
+        if current := _sessions.get():
+            await current.session.commit()
 
     async def close(self) -> None:
         """Close the current session"""
 
-        if sessions := _sessions.get():
-            session, close_event = sessions.pop()
-            _sessions.set(sessions)
+        if current := _sessions.get():
+            session, close_event, created_at, parent = current
+            _sessions.set(parent)
             await session.close()
             close_event.set()
+            if self.metrics:
+                self.metrics.session_lifetime.observe(monotonic() - created_at)
 
     def create_session(self) -> AsyncSession:
         """Create a new async session and store it in the context variable."""
 
-        session = Session(AsyncSession(self.engine, expire_on_commit=False), Event())
-        _sessions.set(_sessions.get() + [session])
+        if self.metrics and self.metrics_log_interval and not self._metrics_task:
+            self._metrics_task = create_task(self._log_metrics())
+
+        session = Session(AsyncSession(self.engine, expire_on_commit=False), Event(), monotonic(), _sessions.get())
+        _sessions.set(session)
         return session.session
 
     @property
     def session(self) -> AsyncSession:
         """Get the session object for the current task"""
 
-        if not (sessions := _sessions.get()):
+        if not (current := _sessions.get()):
             raise RuntimeError("No session available")
 
-        return sessions[-1].session
+        return current.session
 
     async def wait_for_close_event(self) -> None:
-        if sessions := _sessions.get():
-            await sessions[-1].close_event.wait()
+        if current := _sessions.get():
+            await current.close_event.wait()
+
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of the metrics of the primary database and all replicas."""
+
+        return {
+            "primary": self.metrics.stats() if self.metrics else {},
+            "replicas": {
+                str(replica.engine.url.host): {
+                    "lag": replica.lag,
+                    **(replica.metrics.stats() if replica.metrics else {}),
+                }
+                for replica in self.replicas
+            },
+        }
+
+    async def _log_metrics(self) -> None:
+        """Periodically log a summary of the collected metrics."""
+
+        while True:
+            await sleep(self.metrics_log_interval)
+            if self.metrics:
+                logger.info("[db metrics] primary: %s", self.metrics.summary())
+            for replica in self.replicas:
+                if replica.metrics:
+                    logger.info("[db metrics] replica %s: %s", replica.engine.url.host, replica.metrics.summary())
 
 
 def get_database() -> DB:
@@ -266,4 +568,12 @@ def get_database() -> DB:
         pool_size=POOL_SIZE,
         max_overflow=MAX_OVERFLOW,
         echo=SQL_SHOW_STATEMENTS,
+        replicas=[(h, int(p or DB_PORT)) for h, _, p in (x.partition(":") for x in DB_REPLICA_HOSTS)],
+        replica_max_lag=DB_REPLICA_MAX_LAG,
+        replica_check_interval=DB_REPLICA_CHECK_INTERVAL,
+        metrics=DB_METRICS,
+        metrics_log_interval=DB_METRICS_LOG_INTERVAL,
+        slow_query_log_size=DB_SLOW_QUERY_LOG_SIZE,
+        retry_policy=RetryPolicy(DB_RETRY_ATTEMPTS, DB_RETRY_BASE_DELAY, DB_RETRY_MAX_DELAY),
+        shutdown_after=DB_SHUTDOWN_AFTER,
     )
@@ -0,0 +1,195 @@
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from heapq import heappush, heappushpop
+from time import perf_counter, time
+from typing import Any, NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+# upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS: tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+# maximum number of distinct statement fingerprints to keep separate histograms for
+MAX_FINGERPRINTS = 1000
+
+# collapse expanded IN lists and literal values so that equivalent statements share one fingerprint
+_FINGERPRINT_PATTERNS = [
+    (re.compile(r"\(\s*(?:\?|%s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|\$\d+|:\w+))+\s*\)"), "(?+)"),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+\b"), "?"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normalize an sql statement such that statements which only differ in their parameters are equal."""
+
+    for pattern, repl in _FINGERPRINT_PATTERNS:
+        statement = pattern.sub(repl, statement)
+    return statement.strip()
+
+
+class Histogram:
+    """Latency histogram with fixed buckets."""
+
+    def __init__(self) -> None:
+        self.buckets: list[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0,
+            "max": self.max,
+            "buckets": dict(zip([*map(str, LATENCY_BUCKETS), "inf"], self.buckets)),
+        }
+
+
+class SlowQuery(NamedTuple):
+    duration: float
+    timestamp: float
+    statement: str
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool which reports the time spent waiting for a connection."""
+
+    metrics: "DatabaseMetrics | None" = None
+
+    def _do_get(self) -> Any:
+        start = perf_counter()
+        try:
+            # _do_get is the private checkout hook of QueuePool, which is not part of the sqlalchemy stubs
+            return super()._do_get()  # type: ignore[misc]
+        finally:
+            if self.metrics:
+                self.metrics.checkout_wait.observe(perf_counter() - start)
+
+    def recreate(self) -> Pool:
+        pool: Pool = super().recreate()  # type: ignore[no-untyped-call]
+        if isinstance(pool, InstrumentedQueuePool):
+            pool.metrics = self.metrics
+        return pool
+
+
+class DatabaseMetrics:
+    """Collects pool, session and query statistics of an engine."""
+
+    def __init__(self, slow_query_log_size: int = 10):
+        """
+        :param slow_query_log_size: number of slowest queries to keep
+        """
+
+        self.slow_query_log_size = slow_query_log_size
+        self.checkout_wait = Histogram()
+        self.session_lifetime = Histogram()
+        self.queries: dict[str, Histogram] = {}
+        self._slow_queries: list[SlowQuery] = []  # min heap
+        self._pool: Pool | None = None
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """Register event listeners on an engine to collect query metrics."""
+
+        sync_engine = engine.sync_engine
+        self._pool = sync_engine.pool
+        if isinstance(self._pool, InstrumentedQueuePool):
+            self._pool.metrics = self
+
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(sync_engine, "engine_disposed", self._engine_disposed)
+
+    def _engine_disposed(self, engine: Any) -> None:
+        self._pool = engine.pool
+
+    def _before_cursor_execute(self, conn: Any, _: Any, __: Any, ___: Any, ____: Any, _____: Any) -> None:
+        conn.info["query_start"] = perf_counter()
+
+    def _after_cursor_execute(self, conn: Any, _: Any, statement: str, __: Any, ___: Any, ____: Any) -> None:
+        duration = perf_counter() - conn.info.pop("query_start")
+
+        if (histogram := self.queries.get(key := fingerprint(statement))) is None:
+            if len(self.queries) >= MAX_FINGERPRINTS:
+                key = "other"
+            histogram = self.queries.setdefault(key, Histogram())
+        histogram.observe(duration)
+
+        if not self.slow_query_log_size:
+            return
+
+        query = SlowQuery(duration, time(), statement)
+        if len(self._slow_queries) < self.slow_query_log_size:
+            heappush(self._slow_queries, query)
+        elif duration > self._slow_queries[0].duration:
+            heappushpop(self._slow_queries, query)
+
+    @property
+    def slow_queries(self) -> list[SlowQuery]:
+        """The slowest queries, sorted by duration (descending)."""
+
+        return sorted(self._slow_queries, reverse=True)
+
+    def pool_stats(self) -> dict[str, Any]:
+        """Current usage of the connection pool."""
+
+        pool = self._pool
+        if not isinstance(pool, AsyncAdaptedQueuePool):
+            return {}
+
+        # the queue pool methods are not annotated in the sqlalchemy stubs
+        return {
+            "size": pool.size(),  # type: ignore[no-untyped-call]
+            "checked_in": pool.checkedin(),  # type: ignore[no-untyped-call]
+            "checked_out": pool.checkedout(),  # type: ignore[no-untyped-call]
+            "overflow": max(pool.overflow(), 0),  # type: ignore[no-untyped-call]
+            "max_overflow": pool._max_overflow,  # type: ignore[attr-defined] # noqa
+        }
+
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of all collected metrics."""
+
+        return {
+            "pool": self.pool_stats(),
+            "checkout_wait": self.checkout_wait.to_dict(),
+            "session_lifetime": self.session_lifetime.to_dict(),
+            "queries": {key: histogram.to_dict() for key, histogram in self.queries.items()},
+            "slow_queries": [query._asdict() for query in self.slow_queries],
+        }
+
+    def summary(self) -> str:
+        """Return a short human readable summary of the collected metrics."""
+
+        pool = self.pool_stats()
+        wait = self.checkout_wait.to_dict()
+        sessions = self.session_lifetime.to_dict()
+        queries = sum(histogram.count for histogram in self.queries.values())
+        out = (
+            f"pool: {pool.get('checked_out', '?')}/{pool.get('size', '?')} in use, "
+            f"overflow {pool.get('overflow', '?')}/{pool.get('max_overflow', '?')}; "
+            f"checkout wait avg {wait['avg'] * 1000:.1f}ms max {wait['max'] * 1000:.1f}ms; "
+            f"sessions: {sessions['count']} (avg {sessions['avg'] * 1000:.1f}ms); queries: {queries}"
+        )
+        if slow := self.slow_queries:
+            out += f"; slowest {slow[0].duration * 1000:.1f}ms: {fingerprint(slow[0].statement)[:200]}"
+        return out
+
+    def reset(self) -> None:
+        """Reset all collected metrics (pool usage is not affected)."""
+
+        self.checkout_wait = Histogram()
+        self.session_lifetime = Histogram()
+        self.queries.clear()
+        self._slow_queries.clear()
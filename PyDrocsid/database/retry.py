@@ -0,0 +1,83 @@
+import re
+from random import uniform
+from time import monotonic
+
+from sqlalchemy.exc import OperationalError
+
+
+# mysql/mariadb error codes of errors that usually disappear after reconnecting or retrying
+TRANSIENT_ERROR_CODES = {
+    1047,  # WSREP has not yet prepared node for application use (galera)
+    1180,  # got error during COMMIT (galera)
+    1205,  # lock wait timeout exceeded
+    1213,  # deadlock found when trying to get lock
+    2003,  # can't connect to server
+    2006,  # server has gone away
+    2013,  # lost connection to server during query
+}
+
+# error codes which indicate that the whole database node is not usable at the moment
+NODE_ERROR_CODES = {1047, 1180}
+
+
+def get_error_code(error: OperationalError) -> int | None:
+    """Extract the mysql error code of an OperationalError."""
+
+    args = getattr(error.orig, "args", None) or error.args
+    if args and isinstance(args[0], int):
+        return args[0]
+
+    if args and isinstance(args[0], str) and (match := re.search(r"\((\d+),", args[0])):
+        return int(match.group(1))
+
+    return None
+
+
+def is_transient(error: OperationalError) -> bool:
+    """Return whether an OperationalError is likely to disappear after retrying."""
+
+    return error.connection_invalidated or get_error_code(error) in TRANSIENT_ERROR_CODES
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for retrying transient database errors."""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.05, max_delay: float = 2):
+        """
+        :param attempts: maximum number of retries
+        :param base_delay: delay (in seconds) before the first retry
+        :param max_delay: maximum delay (in seconds) between two retries
+        """
+
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Return the (randomized) number of seconds to wait before the given retry attempt (starting at 0)."""
+
+        return uniform(0, min(self.max_delay, self.base_delay * 2**attempt))  # noqa: S311
+
+
+class CircuitBreaker:
+    """Tracks consecutive database failures and trips once they persist for a given amount of time."""
+
+    def __init__(self, timeout: float = 60):
+        """
+        :param timeout: number of seconds of failures without any success after which the breaker trips
+        """
+
+        self.timeout = timeout
+        self.failing_since: float | None = None
+
+    def record_success(self) -> None:
+        self.failing_since = None
+
+    def record_failure(self) -> bool:
+        """Record a failure and return whether the failures have persisted long enough to trip the breaker."""
+
+        now = monotonic()
+        if self.failing_since is None:
+            self.failing_since = now
+
+        return now - self.failing_since >= self.timeout
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from asyncio import CancelledError, Lock, Task, create_task, sleep
+from typing import TYPE_CHECKING, Any, Type
+
+from sqlalchemy import update
+
+from ..logger import get_logger
+
+
+if TYPE_CHECKING:
+    from .database import DB
+
+logger = get_logger(__name__)
+
+# (entity, sorted primary key items)
+RowKey = tuple[Type[Any], tuple[tuple[str, Any], ...]]
+
+
+class PendingUpdate:
+    """Coalesced changes of a single row."""
+
+    __slots__ = ("values", "increments")
+
+    def __init__(self, values: dict[str, Any] | None = None, increments: dict[str, Any] | None = None) -> None:
+        self.values: dict[str, Any] = values or {}
+        self.increments: dict[str, Any] = increments or {}
+
+    def merge(self, newer: PendingUpdate) -> None:
+        """Merge the changes of a newer update into this one."""
+
+        for name in newer.values:
+            self.increments.pop(name, None)
+        self.values.update(newer.values)
+        for name, delta in newer.increments.items():
+            if name in self.values:
+                self.values[name] += delta
+            else:
+                self.increments[name] = self.increments.get(name, 0) + delta
+
+
+class WriteBehindBuffer:
+    """
+    Buffer for frequent writes to the same rows (timestamps, counters).
+    Updates are coalesced in memory and written in one transaction per flush.
+    """
+
+    def __init__(self, db: DB, flush_interval: float = 5, max_size: int = 1000):
+        """
+        :param db: the database to write to
+        :param flush_interval: number of seconds between two flushes
+        :param max_size: number of pending rows after which a flush is triggered immediately
+        """
+
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self._pending: dict[RowKey, PendingUpdate] = {}
+        self._lock = Lock()
+        self._task: Task[None] | None = None
+        self._flush_task: Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _get(self, entity: Type[Any], key: dict[str, Any]) -> PendingUpdate:
+        if not self._task:
+            self._task = create_task(self._flush_loop())
+
+        row_key: RowKey = (entity, tuple(sorted(key.items())))
+        if (pending := self._pending.get(row_key)) is None:
+            pending = self._pending[row_key] = PendingUpdate()
+            if len(self._pending) >= self.max_size and not (self._flush_task and not self._flush_task.done()):
+                self._flush_task = create_task(self.flush())
+
+        return pending
+
+    def set(self, entity: Type[Any], key: dict[str, Any], **values: Any) -> None:
+        """
+        Set column values of a row. Newer values overwrite older pending values.
+
+        :param entity: the mapped class
+        :param key: the primary key of the row (column name -> value)
+        :param values: the new column values
+        """
+
+        self._get(entity, key).merge(PendingUpdate(values=values))
+
+    def increment(self, entity: Type[Any], key: dict[str, Any], **deltas: Any) -> None:
+        """
+        Increment counter columns of a row. Pending increments of the same row are added up.
+
+        :param entity: the mapped class
+        :param key: the primary key of the row (column name -> value)
+        :param deltas: the amounts to add to the columns
+        """
+
+        self._get(entity, key).merge(PendingUpdate(increments=deltas))
+
+    async def flush(self) -> None:
+        """Write all pending updates in a single transaction."""
+
+        async with self._lock:
+            if not self._pending:
+                return
+
+            pending, self._pending = self._pending, {}
+            self.db.create_session()
+            try:
+                for (entity, key), changes in pending.items():
+                    await self._write(entity, dict(key), changes)
+                await self.db.commit()
+            except CancelledError:
+                # keep the updates for the next flush (e.g. the final flush on shutdown)
+                self._requeue(pending)
+                raise
+            except Exception:
+                logger.exception("Could not flush %s buffered rows", len(pending))
+                self._requeue(pending)
+                raise
+            finally:
+                await self.db.close()
+
+    def _requeue(self, pending: dict[RowKey, PendingUpdate]) -> None:
+        """Put the updates of a failed flush back into the buffer. Newer updates take precedence."""
+
+        for row_key, changes in self._pending.items():
+            pending.setdefault(row_key, PendingUpdate()).merge(changes)
+        self._pending = pending
+
+    async def _write(self, entity: Type[Any], key: dict[str, Any], changes: PendingUpdate) -> None:
+        values = {
+            **changes.values,
+            **{name: getattr(entity, name) + delta for name, delta in changes.increments.items()},
+        }
+        statement = update(entity).where(*[getattr(entity, k) == v for k, v in key.items()]).values(**values)
+        result = await self.db.exec(statement.execution_options(synchronize_session=False))
+        if not result.rowcount:
+            # row does not exist yet (counters start at 0)
+            self.db.session.add(entity(**key, **changes.values, **changes.increments))
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:  # noqa: S110
+                pass  # already logged, retry during the next flush
+
+    async def close(self) -> None:
+        """Stop the periodic flush and write all remaining updates. Should be called on shutdown."""
+
+        # wait for a running flush to finish, so its rows are not lost by cancelling it
+        async with self._lock:
+            if self._task:
+                self._task.cancel()
+                self._task = None
+        await self.flush()
@@ -5,15 +5,21 @@ import binascii
 import hashlib
 import json
 import re
-from typing import Any, NamedTuple, cast
+import zlib
+from asyncio import Task
+from asyncio import TimeoutError as AsyncTimeoutError
+from asyncio import create_task, shield
+from typing import Any, NamedTuple
 
+from aiohttp import ClientError
 from discord import Embed, Message
-from httpx import AsyncClient
 
-from PyDrocsid.redis_client import redis
+from PyDrocsid.http_client import get_session
+from PyDrocsid.redis_client import cache, pipeline
 
 
 TTL = 60 * 60 * 24 * 7  # 1 week
+INVALID_LINK_TTL = 60  # 1 minute
 
 DISCOHOOK_EMPTY_MESSAGE = (
     "[https://discohook.org/]"
@@ -25,6 +31,63 @@ class DiscoHookError(Exception):
     pass
 
 
+class InvalidLinkError(DiscoHookError):
+    """The link does not point to a discohook message (in contrast to network errors or discohook outages)."""
+
+    pass
+
+
+# links which are currently being resolved
+_resolving: dict[str, Task[Any]] = {}
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def _compress(data: str) -> str:
+    # the cache backend only stores strings, base85 has less overhead than base64
+    return base64.b85encode(zlib.compress(data.encode(), 9)).decode()
+
+
+def _decompress(data: str) -> str:
+    return zlib.decompress(base64.b85decode(data)).decode()
+
+
+async def _store_payload(data: str, source: str, link: str) -> None:
+    """
+    Store a discohook payload and its links.
+    Payloads are compressed and stored only once under their content hash, even if multiple links point to them.
+
+    :param data: the json payload
+    :param source: the link which has been used to load the payload (or the link which has been created)
+    :param link: the link to return for this payload in create_discohook_link
+    """
+
+    content_hash = _hash(data)
+    async with pipeline() as pipe:
+        pipe.setex(f"discohook:payload:{content_hash}", TTL, _compress(data))
+        pipe.setex(f"discohook:link:{content_hash}", TTL, link)
+        pipe.setex(f"discohook:data:{_hash(source)}", TTL, content_hash)
+
+
+async def _load_payload(link: str) -> Any:
+    """Load a cached discohook payload by one of its links. Raise a DiscoHookError if the link is known as invalid."""
+
+    link_hash = _hash(link)
+    async with cache.pipeline() as pipe:
+        content_hash, invalid = (
+            await pipe.get(f"discohook:data:{link_hash}").exists(f"discohook:invalid:{link_hash}").execute()
+        )
+
+    if invalid:
+        raise InvalidLinkError("Invalid link")
+    if not content_hash or not (payload := await cache.get(f"discohook:payload:{content_hash}")):
+        return None
+
+    return json.loads(_decompress(payload))
+
+
 def _load_embed(data: dict[str, Any]) -> Embed:
     if isinstance(timestamp := data.get("timestamp"), str):
         data["timestamp"] = timestamp.rstrip("Z")
@@ -74,47 +137,67 @@ async def create_discohook_link(*messages: Message | MessageContent) -> str:
     _messages = [(MessageContent.from_message(msg) if isinstance(msg, Message) else msg).to_dict() for msg in messages]
     data = json.dumps({"messages": _messages})
 
-    if out := await redis.get(key := f"discohook:link:{hashlib.sha256(data.encode()).hexdigest()[:16]}"):
-        return cast(str, out)
+    if out := await cache.get(f"discohook:link:{_hash(data)}"):
+        return out
 
     url = f"https://discohook.org/?data={base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')}"
-    client: AsyncClient
-    async with AsyncClient() as client:
-        response = await client.post("https://share.discohook.app/create", json={"url": url})
-        if response.is_error or not isinstance(link := response.json().get("url"), str):
-            raise DiscoHookError("Failed to create link")
-
-    await redis.setex(key, TTL, link)
-    await redis.setex(f"discohook:data:{hashlib.sha256(link.encode()).hexdigest()[:16]}", TTL, data)
+    try:
+        async with get_session().post("https://share.discohook.app/create", json={"url": url}) as response:
+            if not response.ok or not isinstance(link := (await response.json()).get("url"), str):
+                raise DiscoHookError("Failed to create link")
+    except (ClientError, AsyncTimeoutError):
+        raise DiscoHookError("Failed to create link")
 
+    await _store_payload(data, link, link)
     return link
 
 
 async def _load_discohook_data(link: str) -> Any:
-    if out := await redis.get(key := f"discohook:data:{hashlib.sha256(link.encode()).hexdigest()[:16]}"):
-        return json.loads(out)
+    if (out := await _load_payload(link)) is not None:
+        return out
+
+    # concurrent requests for the same link share one lookup
+    if (task := _resolving.get(link)) is None:
+        task = _resolving[link] = create_task(_resolve_link(link))
+        task.add_done_callback(lambda _: _resolving.pop(link, None))
+
+    return await shield(task)
 
-    client: AsyncClient
-    async with AsyncClient() as client:
-        if not link.startswith("https://"):
-            raise DiscoHookError("Invalid link")
-        response = await client.head(link, follow_redirects=True)
-        if response.is_error:
-            raise DiscoHookError("Invalid link")
 
-        url = str(response.url)
+async def _resolve_link(link: str) -> Any:
+    try:
+        return await _fetch_discohook_data(link)
+    except InvalidLinkError:
+        # remember invalid links for a short time, so repeated lookups don't cause external requests
+        await cache.setex(f"discohook:invalid:{_hash(link)}", INVALID_LINK_TTL, 1)
+        raise
+
+
+async def _fetch_discohook_data(link: str) -> Any:
+    if not link.startswith("https://"):
+        raise InvalidLinkError("Invalid link")
+
+    try:
+        async with get_session().head(link, allow_redirects=True) as response:
+            # server errors and rate limits are temporary, so the link is not marked as invalid
+            if response.status >= 500 or response.status == 429:
+                raise DiscoHookError("Could not load link")
+            if not response.ok:
+                raise InvalidLinkError("Invalid link")
+
+            url = str(response.url)
+    except (ClientError, AsyncTimeoutError):
+        raise DiscoHookError("Could not load link")
 
     if not (match := re.match(r"^https://discohook.org/\?data=([a-zA-Z\d\-_]+)$", url)):
-        raise DiscoHookError("Invalid link")
+        raise InvalidLinkError("Invalid link")
 
     try:
         data = json.loads(base64.urlsafe_b64decode(match[1] + "=="))
     except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
-        raise DiscoHookError("Invalid link")
-
-    await redis.setex(key, TTL, json_data := json.dumps(data))
-    await redis.setex(f"discohook:link:{hashlib.sha256(json_data.encode()).hexdigest()[:16]}", TTL, url)
+        raise InvalidLinkError("Invalid link")
 
+    await _store_payload(json.dumps(data), link, url)
     return data
 
 
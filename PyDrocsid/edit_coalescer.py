@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from asyncio import Future, Task, create_task, get_running_loop, shield, sleep
+from typing import Any
+
+from discord import Message
+
+from PyDrocsid.environment import EDIT_COALESCE_INTERVAL
+
+
+class _PendingEdit:
+    __slots__ = ("message", "kwargs", "future")
+
+    def __init__(self, message: Message, kwargs: dict[str, Any], future: Future[Message]):
+        self.message = message
+        self.kwargs = kwargs
+        self.future = future
+
+
+class EditCoalescer:
+    """
+    Coalesces edits of the same message to avoid hitting the edit rate limits.
+    The first edit is sent immediately, further edits within the interval are merged (newer arguments overwrite
+    older ones) and only the latest state is sent once the interval has passed.
+    """
+
+    def __init__(self, interval: float):
+        """
+        :param interval: minimum number of seconds between two edits of the same message
+        """
+
+        self.interval = interval
+        self._pending: dict[int, _PendingEdit] = {}
+        self._sending: dict[int, dict[str, Any]] = {}
+        self._workers: dict[int, Task[None]] = {}
+
+    def get_pending(self, message: Message) -> dict[str, Any] | None:
+        """Return the arguments of the latest edit of a message which has not been applied yet."""
+
+        if (pending := self._pending.get(message.id)) is not None:
+            return pending.kwargs
+        return self._sending.get(message.id)
+
+    async def edit(self, message: Message, **kwargs: Any) -> Message:
+        """
+        Edit a message as soon as the rate limit interval allows it.
+
+        :param message: the message to edit
+        :param kwargs: keyword arguments to pass to message.edit
+        :return: the edited message (after the edit containing these changes has been applied)
+        """
+
+        if (pending := self._pending.get(message.id)) is not None:
+            pending.message = message
+            pending.kwargs.update(kwargs)
+        else:
+            pending = self._pending[message.id] = _PendingEdit(message, kwargs, get_running_loop().create_future())
+
+        if message.id not in self._workers:
+            self._workers[message.id] = create_task(self._run(message.id))
+
+        return await shield(pending.future)
+
+    async def _run(self, message_id: int) -> None:
+        try:
+            while (pending := self._pending.pop(message_id, None)) is not None:
+                self._sending[message_id] = pending.kwargs
+                try:
+                    pending.future.set_result(await pending.message.edit(**pending.kwargs))
+                except Exception as e:  # noqa: B902
+                    pending.future.set_exception(e)
+                finally:
+                    self._sending.pop(message_id, None)
+
+                # edits during this interval are merged and sent afterwards
+                await sleep(self.interval)
+        finally:
+            self._workers.pop(message_id, None)
+
+
+# global edit coalescer for paginations and editable logs
+edit_coalescer = EditCoalescer(EDIT_COALESCE_INTERVAL)
@@ -1,66 +1,94 @@
-from copy import deepcopy
-from typing import Any, cast
+from asyncio import Task, create_task, gather, sleep
+from itertools import chain
+from typing import Any, Iterable, Iterator, cast
 
-from discord import Embed, InteractionResponse, Member, Message, User
+from discord import Embed, HTTPException, InteractionResponse, Member, Message, User
 from discord.abc import Messageable
 from discord.ext.commands.context import Context
 
 from PyDrocsid.command import reply
-from PyDrocsid.environment import DISABLE_PAGINATION
+from PyDrocsid.environment import DISABLE_PAGINATION, LOG_FLUSH_INTERVAL
+from PyDrocsid.logger import get_logger
+from PyDrocsid.multilock import MultiLock
 from PyDrocsid.pagination import create_pagination
 
 
+logger = get_logger(__name__)
+
+
 # an "empty" markdown string (e.g. for empty field names in embeds)
 EMPTY_MARKDOWN = "_ _"
 
 
-def split_lines(text: str, max_size: int, *, first_max_size: int | None = None) -> list[str]:
+def iter_split_lines(text: str, max_size: int, *, first_max_size: int | None = None) -> Iterator[str]:
     """
-    Split a string into a list of substrings such that each substring contains no more than max_size characters.
+    Lazily split a string into substrings such that each substring contains no more than max_size characters.
     To achieve this, this function first tries to split the string at line breaks. Substrings which are still too
-    long are split at spaces and (only if necessary) between any two characters.
+    long are split after a dot, at spaces and (only if necessary) between any two characters.
+    Each substring is sliced from the original string exactly once.
 
     :param text: the string
     :param max_size: maximum number of characters allowed in each substring
     :param first_max_size: optional override for max_size of first substring
-    :return: list of substrings
+    :return: generator of non-empty substrings without leading or trailing spaces and newlines
     """
 
-    # strip any leading or trailing spaces and newlines
-    text = text.strip(" \n")
+    # ignore any leading or trailing spaces and newlines
+    i, end = 0, len(text)
+    while i < end and text[i] in " \n":
+        i += 1
+    while end > i and text[end - 1] in " \n":
+        end -= 1
 
     # max size of current substring
     ms: int = first_max_size or max_size
 
-    # list of substrings
-    out: list[str] = []
-
-    # current position in string
-    i = 0
-    while i + ms < len(text):
-        # try to find a line break within the next ms + 1 characters
-        j = text.rfind("\n", i, i + ms + 1)
-        if j == -1:  # no line break could be found
-            # try to find a dot and space within the next ms + 1 characters
-            j = text.rfind(". ", i, i + ms + 1) + 1
-        if j == -1:  # no line break could be found
-            # try to find a space within the next ms + 1 characters
-            j = text.rfind(" ", i, i + ms + 1)
-
-        if j == -1:  # no line break or space could be found
-            # split string after exactly ms characters
-            j = i + ms
-            out.append(text[i:j])
-            i = j
+    while i + ms < end:
+        window = i + ms + 1
+        if (j := text.rfind("\n", i, window)) != -1:
+            # split string at line break
+            nxt = j + 1
+        elif (j := text.rfind(". ", i, window)) != -1:
+            # split string after dot (the dot should be included in the current substring)
+            j += 1
+            nxt = j + 1
+        elif (j := text.rfind(" ", i, window)) != -1:
+            # split string at space
+            nxt = j + 1
         else:
-            # split string after line break or space
-            out.append(text[i:j])
-            i = j + 1  # line break or space should not be included in next substring
+            # split string after exactly ms characters
+            j = nxt = i + ms
+
+        # strip spaces and newlines by moving the boundaries instead of copying the substring
+        while i < j and text[i] in " \n":
+            i += 1
+        while j > i and text[j - 1] in " \n":
+            j -= 1
+        if i < j:
+            yield text[i:j]
 
+        i = nxt
         ms = max_size
 
-    # strip leading or trailing spaces and newlines from substring and remove empty strings
-    return [y for x in out + [text[i:]] if (y := x.strip(" \n"))]
+    while i < end and text[i] in " \n":
+        i += 1
+    if i < end:
+        yield text[i:end]
+
+
+def split_lines(text: str, max_size: int, *, first_max_size: int | None = None) -> list[str]:
+    """
+    Split a string into a list of substrings such that each substring contains no more than max_size characters.
+    To achieve this, this function first tries to split the string at line breaks. Substrings which are still too
+    long are split at spaces and (only if necessary) between any two characters.
+
+    :param text: the string
+    :param max_size: maximum number of characters allowed in each substring
+    :param first_max_size: optional override for max_size of first substring
+    :return: list of substrings
+    """
+
+    return [*iter_split_lines(text, max_size, first_max_size=first_max_size)]
 
 
 class EmbedLimits:
@@ -79,58 +107,19 @@ class EmbedLimits:
     AUTHOR_URL = 2048
     AUTHOR_ICON_URL = 2048
     TOTAL = 6000
+    EMBEDS = 10  # per message
 
 
-async def send_long_embed(
-    channel: Messageable | Message | InteractionResponse,
-    embed: Embed,
-    *,
-    content: str | None = None,
-    repeat_title: bool = False,
-    repeat_thumbnail: bool = False,
-    repeat_name: bool = False,
-    repeat_image: bool = False,
-    repeat_footer: bool = False,
-    paginate: bool = False,
-    pagination_user: User | Member | None = None,
-    max_fields: int = 25,
-    **kwargs: Any,
-) -> list[Message]:
+def check_embed(embed: Embed, *, reserved: int = 0) -> None:
     """
-    Split and send a long embed in multiple messages.
+    Make sure that all attributes of an embed which cannot be split do not exceed their limits.
 
-    :param channel: the channel into which the messages should be sent
-    :param embed: the embed to send
-    :param content: the content of the first message
-    :param repeat_title: whether to repeat the embed title in every embed
-    :param repeat_thumbnail: whether to repeat the thumbnail image in every embed
-    :param repeat_name: whether to repeat field names in every embed
-    :param repeat_image: whether to repeat the image in every embed
-    :param repeat_footer: whether to repeat the footer in every embed
-    :param paginate: whether to use pagination instead of multiple messages
-    :param pagination_user: the user who should be able to control the pagination
-    :param max_fields: the maximum number of fields an embed is allowed to have
-    :return: list of all messages that have been sent
+    :param embed: the embed to check
+    :param reserved: number of characters to keep free in the title (e.g. for page numbers)
+    :raises ValueError: if an attribute is too long
     """
 
-    if DISABLE_PAGINATION:
-        paginate = False
-        max_fields = EmbedLimits.FIELDS
-
-    # enforce repeat_title, repeat_name and repeat_footer when using pagination
-    if paginate:
-        repeat_title = True
-        repeat_name = True
-        repeat_footer = True
-
-    # always limit max_fields to 25
-    max_fields = min(max_fields, EmbedLimits.FIELDS)
-
-    # the maximum possible size of an embed
-    max_total: int = EmbedLimits.TOTAL - 20 * paginate
-
-    # pre checks
-    if embed.title and len(embed.title) > EmbedLimits.TITLE - 20 * paginate:
+    if embed.title and len(embed.title) > EmbedLimits.TITLE - reserved:
         raise ValueError("Embed title is too long.")
     if embed.url and len(embed.url) > EmbedLimits.URL:
         raise ValueError("Embed url is too long.")
@@ -154,115 +143,250 @@ async def send_long_embed(
         if len(field.name) > EmbedLimits.FIELD_NAME:
             raise ValueError(f"Name of field at position {i} is too long.")
 
-    embeds: list[Embed] = []
 
-    def add_embed(e: Embed) -> None:
-        """Copy and add an embed to the list of embeds."""
+class _EmbedLayout:
+    """Embed which is currently being laid out, with a running size counter."""
+
+    def __init__(
+        self, embed: Embed, *, repeat_title: bool, repeat_thumbnail: bool, repeat_image: bool, repeat_footer: bool
+    ):
+        # raw attributes of the original embed (shared, so they are copied for every output embed)
+        self._data: dict[str, Any] = cast(dict[str, Any], embed.to_dict())
+        self.description: str = self._data.pop("description", "")
+        self.source_fields: list[dict[str, Any]] = self._data.pop("fields", [])
+        self.footer: dict[str, Any] | None = self._data.pop("footer", None) or None
+        self.image: dict[str, Any] | None = self._data.pop("image", None) or None
+        self._title: str | None = self._data.pop("title", None)
+        self._author: dict[str, Any] | None = self._data.pop("author", None)
+        self._thumbnail: dict[str, Any] | None = self._data.pop("thumbnail", None)
+
+        self._repeat_title = repeat_title
+        self._repeat_thumbnail = repeat_thumbnail
+        self._repeat_image = repeat_image
+        self._repeat_footer = repeat_footer
+
+        self._index: int = 0
+        self._description: str = ""
+        self.fields: list[dict[str, Any]] = []
+        self.header_size: int = self._get_header_size()
+        self.size: int = self.header_size
+
+    def _with_title(self) -> bool:
+        return not self._index or self._repeat_title
+
+    def _get_header_size(self) -> int:
+        size = 0
+        if self._with_title():
+            size += len(self._title or "") + len((self._author or {}).get("name", ""))
+        if self._repeat_footer and self.footer:
+            size += len(self.footer.get("text", ""))
+        return size
+
+    def set_description(self, description: str) -> None:
+        self.size += len(description) - len(self._description)
+        self._description = description
+
+    def add_field(self, name: str, value: str, inline: bool) -> None:
+        self.fields.append({"name": name, "value": value, "inline": inline})
+        self.size += len(name) + len(value)
+
+    def add_footer(self) -> None:
+        """Add the footer to the last embed (if it is not repeated in every embed)."""
+
+        self._repeat_footer = True
+        self.size += len(cast(dict[str, Any], self.footer).get("text", ""))
+
+    def finish(self, *, last: bool = False) -> Embed:
+        """Create the current embed and start the next one."""
+
+        out = {k: v.copy() if isinstance(v, dict) else v for k, v in self._data.items()}
+        if self._with_title():
+            if self._title:
+                out["title"] = self._title
+            if self._author:
+                out["author"] = self._author.copy()
+        if self._thumbnail and (not self._index or self._repeat_thumbnail):
+            out["thumbnail"] = self._thumbnail.copy()
+        if self._description:
+            out["description"] = self._description
+        out["fields"] = self.fields
+        if self.footer and self._repeat_footer:
+            out["footer"] = self.footer.copy()
+        if self.image and (self._repeat_image or last):
+            out["image"] = self.image.copy()
+
+        self._index += 1
+        self._description = ""
+        self.fields = []
+        self.header_size = self._get_header_size()
+        self.size = self.header_size
+
+        return Embed.from_dict(out)
+
+
+def layout_embed(
+    embed: Embed,
+    *,
+    repeat_title: bool = False,
+    repeat_thumbnail: bool = False,
+    repeat_name: bool = False,
+    repeat_image: bool = False,
+    repeat_footer: bool = False,
+    max_fields: int = 25,
+    reserved: int = 0,
+) -> Iterator[Embed]:
+    """
+    Lazily split a long embed into multiple embeds which do not exceed the embed limits.
+    Every embed is yielded as soon as it is complete, so it can be sent before the rest has been laid out.
 
-        embeds.append(Embed.from_dict(deepcopy(e.to_dict())))
+    :param embed: the embed to split
+    :param repeat_title: whether to repeat the embed title in every embed
+    :param repeat_thumbnail: whether to repeat the thumbnail image in every embed
+    :param repeat_name: whether to repeat field names in every embed
+    :param repeat_image: whether to repeat the image in every embed
+    :param repeat_footer: whether to repeat the footer in every embed
+    :param max_fields: the maximum number of fields an embed is allowed to have
+    :param reserved: number of characters to keep free in each embed (e.g. for page numbers)
+    :return: generator of embeds
+    """
 
-    def clear_embed(*, clear_completely: bool = False) -> None:
-        if not repeat_title:
-            cur.title = ""
-            cur.remove_author()
-        if not repeat_thumbnail:
-            cur.set_thumbnail(url="")
+    check_embed(embed, reserved=reserved)
 
-        if clear_completely:
-            cur.description = ""
-            cur.clear_fields()
+    # always limit max_fields to 25
+    max_fields = min(max_fields, EmbedLimits.FIELDS)
+
+    # the maximum possible size of an embed
+    max_total: int = EmbedLimits.TOTAL - reserved
 
-    # clear and backup embed fields, footer and image
-    fields = embed.fields.copy()
-    footer = embed.footer
-    image = embed.image
-    cur = embed.copy()
-    cur.clear_fields()
-    if not repeat_footer and footer:
-        delattr(cur, "_footer")
-    if not repeat_image:
-        cur.set_image(url="")
+    cur = _EmbedLayout(
+        embed,
+        repeat_title=repeat_title,
+        repeat_thumbnail=repeat_thumbnail,
+        repeat_image=repeat_image,
+        repeat_footer=repeat_footer,
+    )
 
-    *parts, last = split_lines(cast(str, embed.description or ""), EmbedLimits.DESCRIPTION) or [""]
+    *parts, last = split_lines(cur.description, EmbedLimits.DESCRIPTION) or [""]
     for part in parts:
-        cur.description = part
-        add_embed(cur)
-        clear_embed()
+        cur.set_description(part)
+        yield cur.finish()
 
-    cur.description = last
+    cur.set_description(last)
 
     # add embed fields
-    for field in fields:
-        parts = split_lines(field.value, EmbedLimits.FIELD_VALUE)
-        inline = bool(field.inline) and len(parts) == 1
+    for field in cur.source_fields:
+        field_name: str = field.get("name") or EMPTY_MARKDOWN
+        parts = split_lines(field.get("value", ""), EmbedLimits.FIELD_VALUE)
+        inline = bool(field.get("inline")) and len(parts) == 1
 
-        if not field.name:
-            field.name = EMPTY_MARKDOWN
-
-        field_length: int = len(field.name) + sum(map(len, parts)) + len(EMPTY_MARKDOWN) * (len(parts) - 1)
+        field_length: int = len(field_name) + sum(map(len, parts)) + len(EMPTY_MARKDOWN) * (len(parts) - 1)
 
         # check whether field fits in just one embed
-        total_size_one_embed = field_length
-        total_size_one_embed += len(cur.title)
-        if cur.author:
-            total_size_one_embed += len(cur.author.name)
-        if cur.footer:
-            total_size_one_embed += len(cur.footer.text)
-
-        if len(parts) <= max_fields and total_size_one_embed <= max_total:
-
-            if len(parts) + len(cur.fields) > max_fields or field_length + len(cur) > max_total:
+        if len(parts) <= max_fields and field_length + cur.header_size <= max_total:
+            if len(parts) + len(cur.fields) > max_fields or field_length + cur.size > max_total:
                 # field does not fit into current embed
                 # -> create new embed
-                add_embed(cur)
-                clear_embed(clear_completely=True)
+                yield cur.finish()
 
             # add field to current embed
             for i, part in enumerate(parts):
-                cur.add_field(name=[field.name, EMPTY_MARKDOWN][i > 0], value=part, inline=inline)
+                cur.add_field([field_name, EMPTY_MARKDOWN][i > 0], part, inline)
 
-        else:
+            continue
 
-            # add field parts individually
-            for i, part in enumerate(parts):
-                name: str = [field.name, EMPTY_MARKDOWN][i > 0]
+        # add field parts individually
+        for i, part in enumerate(parts):
+            name: str = [field_name, EMPTY_MARKDOWN][i > 0]
+
+            # check whether embed is full
+            if len(cur.fields) >= max_fields or cur.size + len(name) + len(part) > max_total:
+                # create new embed
+                yield cur.finish()
+                if repeat_name:
+                    name = field_name
+
+            # add field part
+            cur.add_field(name, part, inline)
+
+    # add footer to last embed (if not already repeated)
+    if not repeat_footer and cur.footer:
+        if cur.size + len(cur.footer.get("text", "")) > max_total:
+            yield cur.finish()
 
-                # check whether embed is full
-                if len(cur.fields) >= max_fields or len(cur) + len(name) + len(part) > max_total:
-                    # create new embed
-                    add_embed(cur)
-                    clear_embed(clear_completely=True)
-                    if repeat_name:
-                        name = field.name
+        cur.add_footer()
 
-                # add field part
-                cur.add_field(name=name, value=part, inline=inline)
+    yield cur.finish(last=True)
+
+
+async def send_long_embed(
+    channel: Messageable | Message | InteractionResponse,
+    embed: Embed,
+    *,
+    content: str | None = None,
+    repeat_title: bool = False,
+    repeat_thumbnail: bool = False,
+    repeat_name: bool = False,
+    repeat_image: bool = False,
+    repeat_footer: bool = False,
+    paginate: bool = False,
+    pagination_user: User | Member | None = None,
+    max_fields: int = 25,
+    **kwargs: Any,
+) -> list[Message]:
+    """
+    Split and send a long embed in multiple messages.
+
+    :param channel: the channel into which the messages should be sent
+    :param embed: the embed to send
+    :param content: the content of the first message
+    :param repeat_title: whether to repeat the embed title in every embed
+    :param repeat_thumbnail: whether to repeat the thumbnail image in every embed
+    :param repeat_name: whether to repeat field names in every embed
+    :param repeat_image: whether to repeat the image in every embed
+    :param repeat_footer: whether to repeat the footer in every embed
+    :param paginate: whether to use pagination instead of multiple messages
+    :param pagination_user: the user who should be able to control the pagination
+    :param max_fields: the maximum number of fields an embed is allowed to have
+    :return: list of all messages that have been sent
+    """
 
-    # add footer to last embed (if previously removed)
-    if not repeat_footer and footer:
-        if len(cur) + len(footer.text) > max_total:
-            add_embed(cur)
-            clear_embed(clear_completely=True)
+    if DISABLE_PAGINATION:
+        paginate = False
+        max_fields = EmbedLimits.FIELDS
 
-        cur.set_footer(text=footer.text, icon_url=footer.icon_url)
+    # enforce repeat_title, repeat_name and repeat_footer when using pagination
+    if paginate:
+        repeat_title = True
+        repeat_name = True
+        repeat_footer = True
 
-    # add image to last embed (if previously removed)
-    if not repeat_image and image:
-        cur.set_image(url=image.url)
+    embeds: Iterable[Embed] = layout_embed(
+        embed,
+        repeat_title=repeat_title,
+        repeat_thumbnail=repeat_thumbnail,
+        repeat_name=repeat_name,
+        repeat_image=repeat_image,
+        repeat_footer=repeat_footer,
+        max_fields=max_fields,
+        reserved=20 * paginate,
+    )
 
-    add_embed(cur)
+    # pagination needs all pages up front
+    pages: list[Embed] = [*embeds] if paginate else []
 
     # don't use pagination if there is only one embed
-    if not paginate or len(embeds) <= 1:
-        messages = [
-            await reply(channel, embed=e, content=content if not i else None, **kwargs) for i, e in enumerate(embeds)
-        ]
-    else:
+    if len(pages) > 1:
         # create pagination
         if not pagination_user and isinstance(channel, (Message, Context)):
             pagination_user = channel.author
 
-        messages = [await create_pagination(channel, pagination_user, embeds, **kwargs)]
+        messages = [await create_pagination(channel, pagination_user, pages, **kwargs)]
+    else:
+        # send every embed as soon as it has been laid out
+        messages = [
+            await reply(channel, embed=e, content=content if not i else None, **kwargs)
+            for i, e in enumerate(pages or embeds)
+        ]
 
     return [msg for msg in messages if msg]
 
@@ -292,166 +416,156 @@ def split_message(
     :return: list of all messages that have been sent
     """
 
-    # always limit max_fields to 25
-    max_fields = min(max_fields, EmbedLimits.FIELDS)
-
-    # the maximum possible size of an embed
-    max_total: int = EmbedLimits.TOTAL - 20
-
-    for embed in embeds:
-        # pre-checks
-        if embed.title and len(embed.title) > EmbedLimits.TITLE - 20:
-            raise ValueError("Embed title is too long.")
-        if embed.url and len(embed.url) > EmbedLimits.URL:
-            raise ValueError("Embed url is too long.")
-        if embed.thumbnail and len(embed.thumbnail.url) > EmbedLimits.THUMBNAIL_URL:
-            raise ValueError("Thumbnail url is too long.")
-        if embed.image and len(embed.image.url) > EmbedLimits.IMAGE_URL:
-            raise ValueError("Image url is too long.")
-        if embed.footer:
-            if embed.footer.text and len(embed.footer.text) > EmbedLimits.FOOTER_TEXT:
-                raise ValueError("Footer text is too long.")
-            if embed.footer.icon_url and len(embed.footer.icon_url) > EmbedLimits.FOOTER_ICON_URL:
-                raise ValueError("Footer icon_url is too long.")
-        if embed.author:
-            if len(embed.author.name) > EmbedLimits.AUTHOR_NAME:
-                raise ValueError("Author name is too long.")
-            if embed.author.url and len(embed.author.url) > EmbedLimits.AUTHOR_URL:
-                raise ValueError("Author url is too long.")
-            if embed.author.icon_url and len(embed.author.icon_url) > EmbedLimits.AUTHOR_ICON_URL:
-                raise ValueError("Author icon_url is too long.")
-        for i, field in enumerate(embed.fields):
-            if len(field.name) > EmbedLimits.FIELD_NAME:
-                raise ValueError(f"Name of field at position {i} is too long.")
-
-    tmp: list[Embed] = []
-
-    def add_embed(e: Embed) -> None:
-        """Copy and add an embed to the list of embeds."""
-
-        tmp.append(Embed.from_dict(deepcopy(e.to_dict())))
-
-    def clear_embed(*, clear_completely: bool = False) -> None:
-        if not repeat_title:
-            cur.title = ""
-            cur.remove_author()
-        if not repeat_thumbnail:
-            cur.set_thumbnail(url="")
-
-        if clear_completely:
-            cur.description = ""
-            cur.clear_fields()
-
+    # pre-checks
     for embed in embeds:
-        # clear and backup embed fields, footer and image
-        fields = embed.fields.copy()
-        footer = embed.footer
-        image = embed.image
-        cur = embed.copy()
-        cur.clear_fields()
-        if not repeat_footer and footer:
-            delattr(cur, "_footer")
-        if not repeat_image:
-            cur.set_image(url="")
-
-        *parts, last = split_lines(cast(str, embed.description or ""), EmbedLimits.DESCRIPTION) or [""]
-        for part in parts:
-            cur.description = part
-            add_embed(cur)
-            clear_embed()
-
-        cur.description = last
-
-        # add embed fields
-        for field in fields:
-            parts = split_lines(field.value, EmbedLimits.FIELD_VALUE)
-            inline = bool(field.inline) and len(parts) == 1
-
-            if not field.name:
-                field.name = EMPTY_MARKDOWN
-
-            field_length: int = len(field.name) + sum(map(len, parts)) + len(EMPTY_MARKDOWN) * (len(parts) - 1)
-
-            # check whether field fits in just one embed
-            total_size_one_embed = field_length
-            if cur.title:
-                total_size_one_embed += len(cur.title)
-            if cur.author:
-                total_size_one_embed += len(cur.author.name)
-            if cur.footer:
-                total_size_one_embed += len(cur.footer.text)
-
-            if len(parts) <= max_fields and total_size_one_embed <= max_total:
-
-                if len(parts) + len(cur.fields) > max_fields or field_length + len(cur) > max_total:
-                    # field does not fit into current embed
-                    # -> create new embed
-                    add_embed(cur)
-                    clear_embed(clear_completely=True)
-
-                # add field to current embed
-                for i, part in enumerate(parts):
-                    cur.add_field(name=[field.name, EMPTY_MARKDOWN][i > 0], value=part, inline=inline)
-
-            else:
-
-                # add field parts individually
-                for i, part in enumerate(parts):
-                    name: str = [field.name, EMPTY_MARKDOWN][i > 0]
-
-                    # check whether embed is full
-                    if len(cur.fields) >= max_fields or len(cur) + len(name) + len(part) > max_total:
-                        # create new embed
-                        add_embed(cur)
-                        clear_embed(clear_completely=True)
-                        if repeat_name:
-                            name = field.name
-
-                    # add field part
-                    cur.add_field(name=name, value=part, inline=inline)
-
-        # add footer to last embed (if previously removed)
-        if not repeat_footer and footer:
-            if len(cur) + len(footer.text) > max_total:
-                add_embed(cur)
-                clear_embed(clear_completely=True)
-
-            cur.set_footer(text=footer.text, icon_url=footer.icon_url)
-
-        # add image to last embed (if previously removed)
-        if not repeat_image and image:
-            cur.set_image(url=image.url)
-
-        add_embed(cur)
+        check_embed(embed, reserved=20)
 
     final: list[tuple[str, list[Embed]]] = []
     total_length: int = 0
-    one_message = []
-    for embed in tmp:
-        length = 0
-        if embed.author:
-            length += len(embed.author.name)
-        if embed.footer:
-            length += len(embed.footer.text)
-        if embed.description:
-            length += len(embed.description)
-        if embed.title:
-            length += len(embed.title)
-        for field in embed.fields:
-            if field.name:
-                length += len(field.name)
-            if field.value:
-                length += len(field.value)
-
-        if total_length + length <= 6000:
+    one_message: list[Embed] = []
+    for embed in chain.from_iterable(
+        layout_embed(
+            e,
+            repeat_title=repeat_title,
+            repeat_thumbnail=repeat_thumbnail,
+            repeat_name=repeat_name,
+            repeat_image=repeat_image,
+            repeat_footer=repeat_footer,
+            max_fields=max_fields,
+            reserved=20,
+        )
+        for e in embeds
+    ):
+        length = len(embed)
+        if total_length + length <= EmbedLimits.TOTAL:
             one_message.append(embed)
             total_length += length
         else:
-            final.append((content if not final else None, one_message))
-            one_message.clear()
+            final.append((content if not final else None, one_message))  # type: ignore
+            one_message = [embed]
             total_length = length
-            one_message.append(embed)
     if one_message or not final:
-        final.append((content if not final else None, one_message))
+        final.append((content if not final else None, one_message))  # type: ignore
 
     return final
+
+
+def pack_embeds(embeds: Iterable[Embed]) -> Iterator[list[Embed]]:
+    """
+    Pack embeds into as few messages as possible (see EmbedLimits for the limits per message).
+    Consecutive embeds which only differ in their fields are merged into a single embed.
+    Embeds which exceed the limits on their own are split first.
+
+    :param embeds: the embeds to pack
+    :return: generator of lists of embeds which can be sent in one message each
+    """
+
+    message: list[Embed] = []
+    size: int = 0  # total size of all embeds in the current message
+    header: dict[str, Any] | None = None  # attributes (except fields) of the last embed in the current message
+
+    for embed in chain.from_iterable(layout_embed(e, repeat_title=True) for e in embeds):
+        embed_header = cast(dict[str, Any], embed.to_dict())
+        fields = embed_header.pop("fields", [])
+        fields_size = sum(len(field.get("name", "")) + len(field.get("value", "")) for field in fields)
+
+        if (
+            embed_header == header
+            and len(message[-1].fields) + len(fields) <= EmbedLimits.FIELDS
+            and size + fields_size <= EmbedLimits.TOTAL
+        ):
+            # merge the fields into the last embed
+            for field in fields:
+                message[-1].add_field(name=field["name"], value=field["value"], inline=field.get("inline", True))
+            size += fields_size
+            continue
+
+        if message and (len(message) >= EmbedLimits.EMBEDS or size + len(embed) > EmbedLimits.TOTAL):
+            yield message
+            message, size = [], 0
+
+        message.append(embed)
+        size += len(embed)
+        header = embed_header
+
+    if message:
+        yield message
+
+
+class LogSink:
+    """
+    Buffers log embeds per channel and sends them packed into as few messages as possible (see pack_embeds),
+    so bulk events (e.g. mass bans or purges) produce a handful of messages instead of one message per entry.
+    """
+
+    def __init__(self, flush_interval: float, max_pending: int = 100):
+        """
+        :param flush_interval: number of seconds to wait for more entries after the first entry has been buffered
+        :param max_pending: number of buffered entries in a channel after which the channel is flushed immediately
+        """
+
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: dict[int, tuple[Messageable, list[Embed]]] = {}
+        self._timers: dict[int, Task[None]] = {}
+        self._tasks: set[Task[None]] = set()
+        self._locks: MultiLock[int] = MultiLock()
+
+    def log(self, channel: Messageable, embed: Embed) -> None:
+        """
+        Buffer a log embed. The embed is sent after at most flush_interval seconds.
+
+        :param channel: the log channel
+        :param embed: the log entry
+        """
+
+        key: int = cast(Any, channel).id
+        _, embeds = self._pending.setdefault(key, (channel, []))
+        embeds.append(embed)
+
+        if len(embeds) == self.max_pending:
+            self._start_flush(key)
+        elif key not in self._timers:
+            self._timers[key] = create_task(self._flush_later(key))
+
+    def _start_flush(self, key: int) -> None:
+        task = create_task(self.flush(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_later(self, key: int) -> None:
+        await sleep(self.flush_interval)
+        self._timers.pop(key, None)
+        self._start_flush(key)
+
+    async def flush(self, key: int) -> None:
+        """Send all buffered log entries of a channel."""
+
+        # the lock keeps the order of log entries if flushes overlap
+        async with self._locks[key]:
+            if (pending := self._pending.pop(key, None)) is None:
+                return
+
+            channel, embeds = pending
+            for message in pack_embeds(embeds):
+                try:
+                    await channel.send(embeds=message)
+                except HTTPException as e:
+                    logger.warning("Could not send %s log embeds to channel %s: %s", len(message), key, e)
+
+    async def close(self) -> None:
+        """Send all buffered log entries. Should be called on shutdown."""
+
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+
+        for key in [*self._pending]:
+            await self.flush(key)
+
+        # wait for flushes which have been started before
+        await gather(*self._tasks, return_exceptions=True)
+
+
+# global log sink for bulk log messages
+log_sink = LogSink(LOG_FLUSH_INTERVAL)
@@ -18,14 +18,39 @@ DB_PORT: int = int(getenv("DB_PORT", "3306"))
 DB_DATABASE: str = getenv("DB_DATABASE", "bot")
 DB_USERNAME: str = getenv("DB_USERNAME", "bot")
 DB_PASSWORD: str = getenv("DB_PASSWORD", "bot")
+DB_REPLICA_HOSTS: list[str] = [x for x in map(lambda x: x.strip(), getenv("DB_REPLICA_HOSTS", "").split(",")) if x]
+DB_REPLICA_MAX_LAG: float = float(getenv("DB_REPLICA_MAX_LAG", 5))
+DB_REPLICA_CHECK_INTERVAL: float = float(getenv("DB_REPLICA_CHECK_INTERVAL", 10))
 POOL_RECYCLE: int = int(getenv("POOL_RECYCLE", 300))
 POOL_SIZE: int = int(getenv("POOL_SIZE", 20))
 MAX_OVERFLOW: int = int(getenv("MAX_OVERFLOW", 20))
 SQL_SHOW_STATEMENTS: bool = get_bool("SQL_SHOW_STATEMENTS", False)
+DB_METRICS: bool = get_bool("DB_METRICS", True)
+DB_METRICS_LOG_INTERVAL: float = float(getenv("DB_METRICS_LOG_INTERVAL", 0))
+DB_SLOW_QUERY_LOG_SIZE: int = int(getenv("DB_SLOW_QUERY_LOG_SIZE", 10))
+DB_RETRY_ATTEMPTS: int = int(getenv("DB_RETRY_ATTEMPTS", 3))
+DB_RETRY_BASE_DELAY: float = float(getenv("DB_RETRY_BASE_DELAY", 0.05))
+DB_RETRY_MAX_DELAY: float = float(getenv("DB_RETRY_MAX_DELAY", 2))
+DB_SHUTDOWN_AFTER: float = float(getenv("DB_SHUTDOWN_AFTER", 60))  # seconds of persistent db errors before shutdown
+WRITE_BEHIND_INTERVAL: float = float(getenv("WRITE_BEHIND_INTERVAL", 5))
+WRITE_BEHIND_MAX_SIZE: int = int(getenv("WRITE_BEHIND_MAX_SIZE", 1000))
 
 SENTRY_DSN: str | None = getenv("SENTRY_DSN")  # sentry data source name
 SENTRY_ENVIRONMENT: str = getenv("SENTRY_ENVIRONMENT", "production")
 GITHUB_TOKEN: str | None = getenv("GITHUB_TOKEN")  # github personal access token
+GITHUB_CACHE_TTL: int = int(getenv("GITHUB_CACHE_TTL", 60 * 60))
+GITHUB_CACHE_STALE_TTL: int = int(getenv("GITHUB_CACHE_STALE_TTL", 24 * 60 * 60))  # keep stale values for outages
+
+# executor configuration (0 = default size)
+THREAD_POOL_SIZE: int = int(getenv("THREAD_POOL_SIZE", 0))
+PROCESS_POOL_SIZE: int = int(getenv("PROCESS_POOL_SIZE", 0))
+
+# http client configuration
+HTTP_TIMEOUT: float = float(getenv("HTTP_TIMEOUT", 30))
+HTTP_CONNECT_TIMEOUT: float = float(getenv("HTTP_CONNECT_TIMEOUT", 10))
+HTTP_CONNECTION_LIMIT: int = int(getenv("HTTP_CONNECTION_LIMIT", 100))
+HTTP_CONNECTION_LIMIT_PER_HOST: int = int(getenv("HTTP_CONNECTION_LIMIT_PER_HOST", 10))
+HTTP_KEEPALIVE_TIMEOUT: float = float(getenv("HTTP_KEEPALIVE_TIMEOUT", 30))
 
 OWNER_IDS: list[int] = [int(x) for x in map(lambda x: x.strip(), getenv("OWNER_IDS", "").split(",")) if x]
 SUDOERS: list[int] = [int(x) for x in map(lambda x: x.strip(), getenv("SUDOERS", "").split(",")) if x]
@@ -34,13 +59,28 @@ ADVENT_PATH: str = getenv("ADVENT_PATH", "/tmp/advent")
 DISABLED_COGS: set[str] = set(map(str.lower, getenv("DISABLED_COGS", "").split(",")))
 
 # redis configuration
+CACHE_BACKEND: str = getenv("CACHE_BACKEND", "redis").lower()  # redis or memory
 REDIS_HOST: str = getenv("REDIS_HOST", "localhost")
 REDIS_PORT: int = int(getenv("REDIS_PORT", "6379"))
 REDIS_DB: int = int(getenv("REDIS_DB", "0"))
+REDIS_MAX_CONNECTIONS: int | None = int(x) if (x := getenv("REDIS_MAX_CONNECTIONS")) else None
+REDIS_SOCKET_TIMEOUT: float | None = float(x) if (x := getenv("REDIS_SOCKET_TIMEOUT")) else None
+REDIS_SOCKET_CONNECT_TIMEOUT: float | None = float(x) if (x := getenv("REDIS_SOCKET_CONNECT_TIMEOUT")) else None
+REDIS_HEALTH_CHECK_INTERVAL: int = int(getenv("REDIS_HEALTH_CHECK_INTERVAL", 0))
+LOCAL_CACHE_SIZE: int = int(getenv("LOCAL_CACHE_SIZE", 1024))  # 0 to disable the local cache for hot keys
+LOCAL_CACHE_MAX_AGE: float = float(getenv("LOCAL_CACHE_MAX_AGE", 60))
+LOCAL_CACHE_PREFIXES: list[str] = [
+    x for x in map(lambda x: x.strip(), getenv("LOCAL_CACHE_PREFIXES", "settings:,permissions:").split(",")) if x
+]
 
 CACHE_TTL: int = int(getenv("CACHE_TTL", 8 * 60 * 60))
 RESPONSE_LINK_TTL: int = int(getenv("RESPONSE_LINK_TTL", 2 * 60 * 60))
+RESPONSE_FILTER_CAPACITY: int = int(getenv("RESPONSE_FILTER_CAPACITY", 100_000))
+RESPONSE_FILTER_REBUILD_INTERVAL: int = int(getenv("RESPONSE_FILTER_REBUILD_INTERVAL", 30 * 60))
+RESPONSE_FILTER_GRACE_PERIOD: int = int(getenv("RESPONSE_FILTER_GRACE_PERIOD", 60))
 PAGINATION_TTL: int = int(getenv("PAGINATION_TTL", 2 * 60 * 60))
+EDIT_COALESCE_INTERVAL: float = float(getenv("EDIT_COALESCE_INTERVAL", 1))
+LOG_FLUSH_INTERVAL: float = float(getenv("LOG_FLUSH_INTERVAL", 2))
 
 # configuration for reply feature
 REPLY: bool = get_bool("REPLY", True)
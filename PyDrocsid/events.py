@@ -32,7 +32,7 @@ from PyDrocsid.command_edit import handle_delete, handle_edit
 from PyDrocsid.database import db_wrapper
 from PyDrocsid.multilock import MultiLock
 from PyDrocsid.types import GuildMessageable
-from PyDrocsid.util import check_maintenance
+from PyDrocsid.util import check_maintenance, invalidate_log_message
 
 
 T = TypeVar("T")
@@ -99,6 +99,7 @@ class Events:
 
     @staticmethod
     async def on_message(bot: Bot, message: Message) -> None:
+        invalidate_log_message(message.channel.id, message.id)
         if await check_maintenance(message.author):
             return
         if message.author == bot.user:
@@ -128,6 +129,7 @@ class Events:
 
     @staticmethod
     async def on_message_delete(bot: Bot, message: Message) -> None:
+        invalidate_log_message(message.channel.id, message.id, deleted=True)
         if await check_maintenance(None):
             return
         await call_event_handlers("message_delete", message, identifier=message.id)
@@ -137,6 +139,7 @@ class Events:
 
     @staticmethod
     async def on_raw_message_delete(bot: Bot, event: RawMessageDeleteEvent) -> None:
+        invalidate_log_message(event.channel_id, event.message_id, deleted=True)
         if await check_maintenance(None):
             return
         if event.cached_message is not None:
@@ -428,3 +431,13 @@ def register_events(bot: Bot) -> None:
 
             # TODO use ParamSpec once mypy supports it
             bot.event(cast(Callable[..., Coroutine[None, None, None]], handler))
+
+    # dispatch button clicks of persistent paginations
+    from PyDrocsid.pagination import handle_pagination_interaction
+
+    bot.add_listener(handle_pagination_interaction, "on_interaction")
+
+    # flush buffered writes before the bot shuts down
+    from PyDrocsid.shutdown import register_shutdown
+
+    register_shutdown(bot)
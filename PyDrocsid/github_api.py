@@ -1,45 +1,205 @@
+import json
+import re
+from asyncio import Future, Task, create_task, gather, get_running_loop, shield, sleep
 from collections import namedtuple
+from time import time
 from typing import Any, cast
 
-from aiohttp import ClientSession
-
-from PyDrocsid.environment import GITHUB_TOKEN
+from PyDrocsid.environment import GITHUB_CACHE_STALE_TTL, GITHUB_CACHE_TTL, GITHUB_TOKEN
+from PyDrocsid.http_client import get_session
+from PyDrocsid.redis_client import cache, pipeline
 
 
 GitHubUser = namedtuple("GitHubUser", ["id", "name", "profile"])
 
 API_URL = "https://api.github.com/graphql"
 
+# number of seconds to collect concurrent queries before sending them in one request
+BATCH_WINDOW = 0.05
+
+# timestamp until which the rate limit of the github api is exhausted
+_rate_limit_reset: float = 0
+
+
+async def _request(query: str, **kwargs: Any) -> dict[str, Any] | None:
+    """Send a query to the github graphql api and return the whole response (data and errors)."""
+
+    global _rate_limit_reset
+
+    # don't send requests which would fail anyway
+    if time() < _rate_limit_reset:
+        return None
+
+    headers = {"Authorization": f"bearer {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
+    async with get_session().post(API_URL, headers=headers, json={"query": query, "variables": kwargs}) as response:
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            _rate_limit_reset = float(response.headers.get("X-RateLimit-Reset") or time() + 60)
+
+        if response.status != 200:
+            return None
+
+        return cast(dict[str, Any], await response.json())
+
 
 async def graphql(query: str, **kwargs: Any) -> dict[Any, Any] | None:
     """Send a query to the github graphql api and return the result."""
 
-    headers = {"Authorization": f"bearer {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
-    async with ClientSession() as session:
-        async with session.post(API_URL, headers=headers, json={"query": query, "variables": kwargs}) as response:
-            if response.status != 200:
-                return None
+    if (response := await _request(query, **kwargs)) is None:
+        return None
+
+    return cast(dict[Any, Any] | None, response.get("data"))
+
+
+class _QueryBatcher:
+    """Merges concurrent graphql queries into a single query document with one alias per query."""
+
+    def __init__(self, window: float):
+        """
+        :param window: number of seconds to collect queries before sending them
+        """
+
+        self.window = window
+        self._pending: dict[tuple[str, str], Future[tuple[bool, Any]]] = {}
+        self._task: Task[None] | None = None
+
+    async def query(self, selection: str, **variables: tuple[str, Any]) -> tuple[bool, Any]:
+        """
+        Send a query for a single top level field together with all other queries of the current window.
+
+        :param selection: the field selection, e.g. "repository(owner:$owner,name:$name){description}"
+        :param variables: graphql type and value of each variable used in the selection
+        :return: whether the request was successful and the value of the field
+        """
+
+        key = (selection, json.dumps(variables, sort_keys=True))
+        if (future := self._pending.get(key)) is None:
+            future = self._pending[key] = get_running_loop().create_future()
 
-            return cast(dict[Any, Any], (await response.json())["data"])
+        if not self._task:
+            self._task = create_task(self._send())
+
+        return await shield(future)
+
+    async def _send(self) -> None:
+        await sleep(self.window)
+        pending, self._pending = self._pending, {}
+        self._task = None
+        await self._execute(pending)
+
+    async def _execute(self, pending: dict[tuple[str, str], Future[tuple[bool, Any]]]) -> None:
+        fields: list[str] = []
+        declarations: list[str] = []
+        values: dict[str, Any] = {}
+        for i, (selection, variables) in enumerate(pending):
+            # prefix all variables with the alias of the query to avoid conflicts
+            fields.append(f"q{i}:" + re.sub(r"\$(\w+)", rf"$q{i}_\1", selection))
+            for name, (type_, value) in json.loads(variables).items():
+                declarations.append(f"$q{i}_{name}:{type_}")
+                values[f"q{i}_{name}"] = value
+
+        try:
+            response = await _request(f"query({','.join(declarations)}){{{' '.join(fields)}}}", **values)
+        except Exception as e:  # noqa: B902
+            for future in pending.values():
+                future.set_exception(e)
+            return
+
+        if response is not None and response.get("data") is None and len(pending) > 1:
+            # the whole document has been rejected (e.g. because of a malformed query), so only the affected
+            # queries fail if they are sent separately
+            await gather(*[self._execute({key: future}) for key, future in pending.items()])
+            return
+
+        # errors of single fields only affect the query with this alias (missing nodes are valid results)
+        data = (response or {}).get("data")
+        failed = {
+            error["path"][0]
+            for error in (response or {}).get("errors") or []
+            if error.get("path") and error.get("type") != "NOT_FOUND"
+        }
+        for i, future in enumerate(pending.values()):
+            future.set_result((data is not None and f"q{i}" not in failed, (data or {}).get(f"q{i}")))
+
+
+_batcher = _QueryBatcher(BATCH_WINDOW)
+
+
+async def _cache_get(*keys: str) -> list[tuple[bool, Any] | None]:
+    """Return whether each cached value is still fresh and the value itself (or None if it is not cached)."""
+
+    async with cache.pipeline() as pipe:
+        for key in keys:
+            pipe.get(key)
+        entries = await pipe.execute()
+
+    out: list[tuple[bool, Any] | None] = []
+    for entry in entries:
+        if entry is None:
+            out.append(None)
+        else:
+            entry = json.loads(entry)
+            out.append((entry["expires"] > time(), entry["value"]))
+
+    return out
+
+
+async def _cache_set(items: dict[str, Any]) -> None:
+    # stale values are kept longer, so they can still be used if github is not available or rate limited
+    async with pipeline() as pipe:
+        for key, value in items.items():
+            pipe.setex(key, GITHUB_CACHE_STALE_TTL, json.dumps({"expires": time() + GITHUB_CACHE_TTL, "value": value}))
 
 
 async def get_users(ids: list[str]) -> dict[str, GitHubUser] | None:
     """Get a list of github users by their ids."""
 
-    result = await graphql("query($ids:[ID!]!){nodes(ids:$ids){...on User{id,login,url}}}", ids=ids)
-    if not result:
-        return None
+    users: dict[str, GitHubUser] = {}
+    missing: list[tuple[str, Any]] = []
+    for user_id, cached in zip(ids, await _cache_get(*[f"github:user:{user_id}" for user_id in ids])):
+        if cached and cached[0]:
+            if cached[1]:
+                users[user_id] = GitHubUser(*cached[1])
+        else:
+            missing.append((user_id, cached))
+
+    results = await gather(
+        *[_batcher.query("node(id:$id){...on User{id,login,url}}", id=("ID!", user_id)) for user_id, _ in missing]
+    )
 
-    return {user["id"]: GitHubUser(user["id"], user["login"], user["url"]) for user in result["nodes"]}
+    fetched: dict[str, Any] = {}
+    for (user_id, cached), (ok, user) in zip(missing, results):
+        if not ok:
+            if not cached:
+                return None
+
+            # use stale value
+            user = cached[1]
+        elif user and "id" in user:
+            user = fetched[f"github:user:{user_id}"] = [user["id"], user["login"], user["url"]]
+        else:
+            user = fetched[f"github:user:{user_id}"] = None
+
+        if user:
+            users[user_id] = GitHubUser(*user)
+
+    await _cache_set(fetched)
+    return users
 
 
 async def get_repo_description(owner: str, name: str) -> str | None:
     """Get the description of a github repository."""
 
-    result = await graphql(
-        "query($owner:String!,$name:String!){repository(owner:$owner,name:$name){description}}", owner=owner, name=name
+    [cached] = await _cache_get(key := f"github:repo:{owner}/{name}")
+    if cached and cached[0]:
+        return cast(str | None, cached[1])
+
+    ok, repository = await _batcher.query(
+        "repository(owner:$owner,name:$name){description}", owner=("String!", owner), name=("String!", name)
     )
-    if not result:
-        return None
+    if not ok:
+        # use stale value
+        return cast(str | None, cached[1]) if cached else None
 
-    return cast(str | None, result["repository"]["description"])
+    description = repository and repository["description"]
+    await _cache_set({key: description})
+    return cast(str | None, description)
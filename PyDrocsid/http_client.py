@@ -0,0 +1,44 @@
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from PyDrocsid.environment import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_CONNECTION_LIMIT,
+    HTTP_CONNECTION_LIMIT_PER_HOST,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_TIMEOUT,
+)
+
+
+_session: ClientSession | None = None
+
+
+def get_session() -> ClientSession:
+    """
+    Return the shared http client session. Connections are kept alive and reused across requests.
+    The session is created lazily, because it has to be created inside the running event loop.
+    """
+
+    global _session
+
+    if _session is None or _session.closed:
+        _session = ClientSession(
+            connector=TCPConnector(
+                limit=HTTP_CONNECTION_LIMIT,
+                limit_per_host=HTTP_CONNECTION_LIMIT_PER_HOST,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=300,
+            ),
+            timeout=ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        )
+
+    return _session
+
+
+async def close_session() -> None:
+    """Close the shared http client session and all pooled connections. Should be called on shutdown."""
+
+    global _session
+
+    if _session is not None:
+        await _session.close()
+        _session = None
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+from asyncio import Queue, QueueEmpty
+from asyncio import TimeoutError as AsyncTimeoutError
+from asyncio import wait_for
+from fnmatch import fnmatchcase
+from time import monotonic
+from typing import Any, AsyncIterator, Type
+
+
+# number of ttl updates after which all expired keys are removed
+PURGE_INTERVAL = 1000
+
+
+def _encode(value: Any) -> str:
+    """Convert a value to a string like redis does."""
+
+    if isinstance(value, bytes):
+        return value.decode()
+    if isinstance(value, str):
+        return value
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class MemoryPubSub:
+    """In-process replacement for redis.asyncio.client.PubSub."""
+
+    def __init__(self, cache: MemoryCache):
+        self._cache = cache
+        self._queue: Queue[dict[str, Any]] = Queue()
+        self.channels: set[str] = set()
+        self.patterns: set[str] = set()
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self.channels.add(channel)
+            self._cache._subscribers.setdefault(channel, set()).add(self)
+            self._queue.put_nowait({"type": "subscribe", "channel": channel, "data": len(self.channels)})
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for channel in channels or [*self.channels]:
+            self.channels.discard(channel)
+            self._cache._subscribers.get(channel, set()).discard(self)
+            self._queue.put_nowait({"type": "unsubscribe", "channel": channel, "data": len(self.channels)})
+
+    async def psubscribe(self, *patterns: str) -> None:
+        for pattern in patterns:
+            self.patterns.add(pattern)
+            self._cache._pattern_subscribers.add(self)
+            self._queue.put_nowait({"type": "psubscribe", "channel": pattern, "data": len(self.patterns)})
+
+    async def punsubscribe(self, *patterns: str) -> None:
+        for pattern in patterns or [*self.patterns]:
+            self.patterns.discard(pattern)
+            self._queue.put_nowait({"type": "punsubscribe", "channel": pattern, "data": len(self.patterns)})
+        if not self.patterns:
+            self._cache._pattern_subscribers.discard(self)
+
+    def _deliver(self, channel: str, data: str) -> None:
+        if channel in self.channels:
+            self._queue.put_nowait({"type": "message", "channel": channel, "data": data})
+        for pattern in self.patterns:
+            if fnmatchcase(channel, pattern):
+                self._queue.put_nowait({"type": "pmessage", "pattern": pattern, "channel": channel, "data": data})
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0) -> dict[str, Any] | None:
+        while True:
+            try:
+                message = await wait_for(self._queue.get(), timeout) if timeout else self._queue.get_nowait()
+            except (AsyncTimeoutError, QueueEmpty):
+                return None
+            if not ignore_subscribe_messages or message["type"] == "message":
+                return message
+
+    async def listen(self) -> AsyncIterator[dict[str, Any]]:
+        while self.channels or self.patterns:
+            yield await self._queue.get()
+
+    async def close(self) -> None:
+        await self.unsubscribe()
+        await self.punsubscribe()
+
+    reset = close
+
+    async def __aenter__(self) -> MemoryPubSub:
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.close()
+
+
+class MemoryPipeline:
+    """In-process replacement for redis.asyncio.client.Pipeline. Commands are executed in order on execute()."""
+
+    def __init__(self, cache: MemoryCache):
+        self._cache = cache
+        self._commands: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    def _queue(self, name: str, *args: Any, **kwargs: Any) -> MemoryPipeline:
+        self._commands.append((name, args, kwargs))
+        return self
+
+    def exists(self, *keys: str) -> MemoryPipeline:
+        return self._queue("exists", *keys)
+
+    def delete(self, *keys: str) -> MemoryPipeline:
+        return self._queue("delete", *keys)
+
+    def expire(self, key: str, seconds: float) -> MemoryPipeline:
+        return self._queue("expire", key, seconds)
+
+    def ttl(self, key: str) -> MemoryPipeline:
+        return self._queue("ttl", key)
+
+    def get(self, key: str) -> MemoryPipeline:
+        return self._queue("get", key)
+
+    def set(
+        self, key: str, value: Any, ex: float | None = None, px: float | None = None, nx: bool = False
+    ) -> MemoryPipeline:
+        return self._queue("set", key, value, ex=ex, px=px, nx=nx)
+
+    def setex(self, key: str, seconds: float, value: Any) -> MemoryPipeline:
+        return self._queue("setex", key, seconds, value)
+
+    def incrby(self, key: str, amount: int = 1) -> MemoryPipeline:
+        return self._queue("incrby", key, amount)
+
+    def incr(self, key: str, amount: int = 1) -> MemoryPipeline:
+        return self._queue("incr", key, amount)
+
+    def lpush(self, key: str, *values: Any) -> MemoryPipeline:
+        return self._queue("lpush", key, *values)
+
+    def rpush(self, key: str, *values: Any) -> MemoryPipeline:
+        return self._queue("rpush", key, *values)
+
+    def lrange(self, key: str, start: int, end: int) -> MemoryPipeline:
+        return self._queue("lrange", key, start, end)
+
+    def llen(self, key: str) -> MemoryPipeline:
+        return self._queue("llen", key)
+
+    def publish(self, channel: str, message: Any) -> MemoryPipeline:
+        return self._queue("publish", channel, message)
+
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        commands, self._commands = self._commands, []
+        return [await getattr(self._cache, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+    def reset(self) -> None:
+        self._commands.clear()
+
+    async def __aenter__(self) -> MemoryPipeline:
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        self.reset()
+
+
+class MemoryCache:
+    """
+    Process-local replacement for the subset of the redis api used by PyDrocsid (strings, lists, ttl, pub/sub).
+    Values are stored as strings, just like a redis client with decode_responses=True returns them.
+    Only suitable for single node deployments and tests, as the data is not shared between processes.
+    """
+
+    def __init__(self) -> None:
+        self._data: dict[str, str | list[str]] = {}
+        self._expires: dict[str, float] = {}
+        self._subscribers: dict[str, set[MemoryPubSub]] = {}
+        self._pattern_subscribers: set[MemoryPubSub] = set()
+        self._ttl_updates = 0
+
+    def _alive(self, key: str) -> bool:
+        if (expires := self._expires.get(key)) is not None and expires <= monotonic():
+            self._data.pop(key, None)
+            del self._expires[key]
+        return key in self._data
+
+    def _get_type(self, key: str, dtype: Type[Any]) -> Any:
+        if not self._alive(key):
+            return None
+        if not isinstance(value := self._data[key], dtype):
+            raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def _set_ttl(self, key: str, seconds: float | None) -> None:
+        if seconds is None:
+            self._expires.pop(key, None)
+            return
+
+        self._expires[key] = monotonic() + seconds
+
+        # expired keys are only removed when accessed, so purge them periodically to bound memory usage
+        self._ttl_updates += 1
+        if self._ttl_updates >= PURGE_INTERVAL:
+            self._ttl_updates = 0
+            for k in [k for k, expires in self._expires.items() if expires <= monotonic()]:
+                self._alive(k)
+
+    # keys
+
+    async def exists(self, *keys: str) -> int:
+        return sum(map(self._alive, keys))
+
+    async def delete(self, *keys: str) -> int:
+        count = 0
+        for key in keys:
+            count += self._alive(key)
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return count
+
+    async def expire(self, key: str, seconds: float) -> bool:
+        if not self._alive(key):
+            return False
+        self._set_ttl(key, seconds)
+        return True
+
+    async def ttl(self, key: str) -> int:
+        if not self._alive(key):
+            return -2
+        if (expires := self._expires.get(key)) is None:
+            return -1
+        return round(expires - monotonic())
+
+    async def scan_iter(self, match: str | None = None, count: int | None = None) -> AsyncIterator[str]:
+        for key in [*self._data]:
+            if self._alive(key) and (match is None or fnmatchcase(key, match)):
+                yield key
+
+    async def keys(self, pattern: str = "*") -> list[str]:
+        return [key async for key in self.scan_iter(pattern)]
+
+    async def flushdb(self) -> bool:
+        self._data.clear()
+        self._expires.clear()
+        return True
+
+    # strings
+
+    async def get(self, key: str) -> str | None:
+        return self._get_type(key, str)  # type: ignore
+
+    async def set(
+        self, key: str, value: Any, ex: float | None = None, px: float | None = None, nx: bool = False
+    ) -> bool | None:
+        if nx and self._alive(key):
+            return None
+        self._data[key] = _encode(value)
+        self._set_ttl(key, ex if px is None else px / 1000)
+        return True
+
+    async def setex(self, key: str, seconds: float, value: Any) -> bool:
+        return bool(await self.set(key, value, ex=seconds))
+
+    async def incrby(self, key: str, amount: int = 1) -> int:
+        value = int(self._get_type(key, str) or 0) + amount
+        self._data[key] = str(value)
+        return value
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self.incrby(key, amount)
+
+    # lists
+
+    def _get_list(self, key: str) -> list[str]:
+        if (value := self._get_type(key, list)) is None:
+            value = self._data[key] = []
+        return value  # type: ignore
+
+    async def lpush(self, key: str, *values: Any) -> int:
+        lst = self._get_list(key)
+        lst[:0] = [_encode(v) for v in reversed(values)]
+        return len(lst)
+
+    async def rpush(self, key: str, *values: Any) -> int:
+        lst = self._get_list(key)
+        lst.extend(map(_encode, values))
+        return len(lst)
+
+    async def lrange(self, key: str, start: int, end: int) -> list[str]:
+        lst: list[str] = self._get_type(key, list) or []
+        return lst[start : (end + 1) or None]
+
+    async def llen(self, key: str) -> int:
+        return len(self._get_type(key, list) or [])
+
+    # pub/sub
+
+    async def publish(self, channel: str, message: Any) -> int:
+        subscribers = self._subscribers.get(channel, set()) | self._pattern_subscribers
+        for subscriber in subscribers:
+            subscriber._deliver(channel, _encode(message))
+        return len(subscribers)
+
+    def pubsub(self, **_: Any) -> MemoryPubSub:
+        return MemoryPubSub(self)
+
+    # client
+
+    def pipeline(self, transaction: bool = True) -> MemoryPipeline:
+        # commands are executed without awaiting anything in between, so they are always atomic
+        return MemoryPipeline(self)
+
+    async def ping(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        pass
@@ -1,34 +1,197 @@
 from __future__ import annotations
 
-from typing import Any
+import json
+from asyncio import Lock
+from collections import OrderedDict
+from functools import partial
+from inspect import isawaitable
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar, cast
+from uuid import uuid4
 
-from discord import ButtonStyle, Embed, Interaction, InteractionResponse, Member, Message, User, ui
+from discord import ButtonStyle, Embed, Interaction, InteractionResponse, InteractionType, Member, Message, User, ui
 from discord.abc import Messageable
 
 from PyDrocsid.command import MaintenanceAwareView, reply
+from PyDrocsid.database import db_wrapper
+from PyDrocsid.edit_coalescer import edit_coalescer
 from PyDrocsid.environment import PAGINATION_TTL
+from PyDrocsid.redis_client import cache, pipeline
+from PyDrocsid.util import check_maintenance
+
+
+# prefix of the custom ids of persistent pagination buttons
+PAGINATION_CUSTOM_ID = "pagination"
+
+PageRenderer = Callable[[Any, int], Awaitable[Embed]]
+R = TypeVar("R", bound=PageRenderer)
+
+_page_renderers: dict[str, PageRenderer] = {}
+
+
+def _button_specs(page: int, count: int) -> list[tuple[str, ButtonStyle, int]]:
+    """Return label, style and target page of all pagination buttons."""
+
+    return [
+        ("<<", ButtonStyle.blurple, 0),
+        ("<", ButtonStyle.red, page - 1),
+        (f"{page + 1}/{count}", ButtonStyle.grey, -1),
+        (">", ButtonStyle.green, page + 1),
+        (">>", ButtonStyle.blurple, count - 1),
+    ]
+
+
+class PageSource:
+    """Immutable source of pagination pages which can be shared by multiple paginators."""
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    async def get_page(self, page: int) -> Embed:
+        raise NotImplementedError
+
+
+class ListPageSource(PageSource):
+    """Page source of already rendered pages."""
+
+    def __init__(self, pages: list[Embed]):
+        self.pages = pages
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    async def get_page(self, page: int) -> Embed:
+        return self.pages[page]
+
+
+class LazyPageSource(PageSource):
+    """Page source which renders pages on demand and keeps only the most recently used pages."""
+
+    def __init__(self, count: int, render: Callable[[int], Embed | Awaitable[Embed]], *, cache_size: int = 8):
+        """
+        :param count: the total number of pages
+        :param render: function (sync or async) which renders the page with the given index
+        :param cache_size: maximum number of rendered pages to keep
+        """
+
+        self.count = count
+        self.render = render
+        self.cache_size = cache_size
+        self._cache: OrderedDict[int, Embed] = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.count
+
+    async def get_page(self, page: int) -> Embed:
+        if page not in range(self.count):
+            raise IndexError(page)
+
+        if (cached := self._cache.get(page)) is not None:
+            self._cache.move_to_end(page)
+            return cached
+
+        rendered = self.render(page)
+        embed = cast(Embed, await rendered if isawaitable(rendered) else rendered)
+
+        self._cache[page] = embed
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return embed
+
+
+class IteratorPageSource(PageSource):
+    """
+    Page source which consumes an async iterator of pages on demand.
+    Only pages up to the highest page that has been requested so far are rendered and kept.
+    """
+
+    def __init__(self, count: int, pages: AsyncIterator[Embed]):
+        """
+        :param count: the total number of pages (reduced if the iterator ends early)
+        :param pages: async iterator which yields the pages in order
+        """
+
+        self.count = count
+        self._iterator = pages
+        self._pages: list[Embed] = []
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return self.count
+
+    async def get_page(self, page: int) -> Embed:
+        if page not in range(self.count):
+            raise IndexError(page)
+
+        async with self._lock:
+            while len(self._pages) <= page:
+                try:
+                    self._pages.append(await self._iterator.__anext__())
+                except StopAsyncIteration:
+                    # fewer pages than announced: show the last page (or an empty one) instead
+                    self.count = len(self._pages)
+                    return self._pages[-1] if self._pages else Embed()
+
+        return self._pages[page]
+
+
+def page_renderer(name: str) -> Callable[[R], R]:
+    """
+    Register a function which renders pages of persistent paginations.
+    The function is called with the (json serializable) arguments of the page source and the page index.
+
+    :param name: unique name of the renderer, which is stored in the cache instead of the rendered pages
+    """
+
+    def deco(func: R) -> R:
+        _page_renderers[name] = func
+        return func
+
+    return deco
+
+
+class RendererPageSource(LazyPageSource):
+    """Page source which renders pages using a registered page renderer, so it can be restored after restarts."""
+
+    def __init__(self, renderer: str, args: Any, count: int, *, cache_size: int = 8):
+        """
+        :param renderer: the name of the page renderer
+        :param args: json serializable arguments to pass to the page renderer
+        :param count: the total number of pages
+        :param cache_size: maximum number of rendered pages to keep
+        """
+
+        if renderer not in _page_renderers:
+            raise ValueError(f"Unknown page renderer: {renderer}")
+
+        super().__init__(count, partial(_page_renderers[renderer], args), cache_size=cache_size)
+        self.renderer = renderer
+        self.args = args
 
 
 class PaginatorButton(ui.Button[MaintenanceAwareView]):
     def __init__(self, paginator: Paginator, label: str, style: ButtonStyle, page: int):
         super().__init__(
-            label=label, style=style, disabled=page == paginator.page or page not in range(len(paginator.pages))
+            label=label, style=style, disabled=page == paginator.page or page not in range(len(paginator.source))
         )
 
         self.paginator = paginator
         self.page = page
 
     async def callback(self, interaction: Interaction) -> None:
-        await self.paginator.goto_page(self.page)
+        # acknowledge the interaction first, as rendering and editing might exceed the interaction deadline
         await interaction.response.defer()
+        await self.paginator.goto_page(self.page)
 
 
 class Paginator(MaintenanceAwareView):
-    def __init__(self, pages: list[Embed], *, timeout: float, page: int = 0, user: User | Member | None = None):
+    def __init__(
+        self, pages: list[Embed] | PageSource, *, timeout: float, page: int = 0, user: User | Member | None = None
+    ):
         super().__init__(timeout=timeout)
 
         self._timeout = timeout
-        self.pages = pages
+        self.source: PageSource = pages if isinstance(pages, PageSource) else ListPageSource(pages)
         self.page = page
         self.user = user
         self.message: Message | None = None
@@ -36,11 +199,8 @@ class Paginator(MaintenanceAwareView):
 
     def _update_buttons(self) -> None:
         self.buttons = [
-            PaginatorButton(self, "<<", ButtonStyle.blurple, 0),
-            PaginatorButton(self, "<", ButtonStyle.red, self.page - 1),
-            PaginatorButton(self, f"{self.page + 1}/{len(self.pages)}", ButtonStyle.grey, -1),
-            PaginatorButton(self, ">", ButtonStyle.green, self.page + 1),
-            PaginatorButton(self, ">>", ButtonStyle.blurple, len(self.pages) - 1),
+            PaginatorButton(self, label, style, page)
+            for label, style, page in _button_specs(self.page, len(self.source))
         ]
 
         self.clear_items()
@@ -50,15 +210,24 @@ class Paginator(MaintenanceAwareView):
             self.add_item(button)
 
     async def reply(self, channel: Message | Messageable | InteractionResponse, **kwargs: Any) -> Message:
-        self._update_buttons()
-        self.message = await reply(channel, embed=self.pages[self.page], view=self, **kwargs)
+        embed = await self._get_page()
+        self.message = await reply(channel, embed=embed, view=self, **kwargs)
         return self.message
 
-    async def _update(self) -> None:
-        self.page = min(max(self.page, 0), len(self.pages) - 1)
+    async def _get_page(self) -> Embed:
+        self.page = min(max(self.page, 0), len(self.source) - 1)
+        embed = await self.source.get_page(self.page)
+
+        # the number of pages might have been reduced while rendering the page
+        self.page = max(min(self.page, len(self.source) - 1), 0)
         self._update_buttons()
+        return embed
+
+    async def _update(self) -> None:
+        embed = await self._get_page()
         if isinstance(self.message, Message):
-            await self.message.edit(embed=self.pages[self.page], view=self)
+            # rapid clicks are merged into one edit
+            await edit_coalescer.edit(self.message, embed=embed, view=self)
 
     async def goto_page(self, page: int) -> None:
         self.page = page
@@ -73,7 +242,8 @@ class Paginator(MaintenanceAwareView):
         if not self.user or self.user == interaction.user:
             return True
 
-        paginator = Paginator(self.pages, timeout=self._timeout, user=interaction.user)
+        # the page source is shared, so pages are not rendered again for every user
+        paginator = Paginator(self.source, timeout=self._timeout, user=interaction.user)
         for button in self.buttons:
             if interaction.data and button.custom_id == interaction.data.get("custom_id"):
                 await paginator.goto_page(button.page)
@@ -84,15 +254,154 @@ class Paginator(MaintenanceAwareView):
 
 
 async def create_pagination(
-    channel: Message | Messageable | InteractionResponse, user: User | Member | None, embeds: list[Embed], **kwargs: Any
+    channel: Message | Messageable | InteractionResponse,
+    user: User | Member | None,
+    embeds: list[Embed] | PageSource,
+    *,
+    persistent: bool = False,
+    **kwargs: Any,
 ) -> Message:
     """
     Create embed pagination on a message.
 
     :param channel: the channel to send the message to
     :param user: the user who should be able to control the pagination
-    :param embeds: a list of embeds
+    :param embeds: a list of embeds or a page source which renders the pages on demand
+    :param persistent: whether to store the pagination in the cache instead of keeping a view in memory, so it keeps
+                       working after restarts (requires a list of embeds or a RendererPageSource)
     """
 
+    if persistent:
+        return await _create_persistent_pagination(channel, user, embeds, **kwargs)
+
     paginator = Paginator(embeds, timeout=PAGINATION_TTL, user=user)
     return await paginator.reply(channel, **kwargs)
+
+
+def _persistent_view(source_id: str, page: int, count: int, user_id: int) -> ui.View:
+    view = ui.View(timeout=None)
+    for slot, (label, style, target) in enumerate(_button_specs(page, count)):
+        view.add_item(
+            ui.Button(
+                label=label,
+                style=style,
+                disabled=target == page or target not in range(count),
+                # the slot keeps custom ids unique if multiple buttons point to the same page
+                custom_id=f"{PAGINATION_CUSTOM_ID}:{slot}:{source_id}:{target}:{user_id}",
+            )
+        )
+
+    return view
+
+
+async def _send_persistent_view(
+    channel: Message | Messageable | InteractionResponse, view: ui.View, embed: Embed, **kwargs: Any
+) -> Message:
+    try:
+        return await reply(channel, embed=embed, view=view, **kwargs)
+    finally:
+        # button clicks are dispatched by handle_pagination_interaction, so the view does not need to be kept
+        view.stop()
+
+
+async def _create_persistent_pagination(
+    channel: Message | Messageable | InteractionResponse,
+    user: User | Member | None,
+    embeds: list[Embed] | PageSource,
+    **kwargs: Any,
+) -> Message:
+    source = ListPageSource(embeds) if isinstance(embeds, list) else embeds
+    meta: dict[str, Any] = {"count": len(source)}
+    if isinstance(source, RendererPageSource):
+        meta |= {"renderer": source.renderer, "args": source.args}
+    elif not isinstance(source, ListPageSource):
+        raise TypeError("Persistent paginations require a list of embeds or a RendererPageSource")
+
+    # store the page source in the cache, so paginations can be restored by any node at any time
+    source_id = uuid4().hex
+    async with pipeline() as pipe:
+        pipe.setex(f"pagination:{source_id}", PAGINATION_TTL, json.dumps(meta))
+        if isinstance(source, ListPageSource):
+            for i, page in enumerate(source.pages):
+                pipe.setex(f"pagination:{source_id}:{i}", PAGINATION_TTL, json.dumps(page.to_dict()))
+
+    view = _persistent_view(source_id, 0, len(source), user.id if user else 0)
+    return await _send_persistent_view(channel, view, await source.get_page(0), **kwargs)
+
+
+async def _load_page(source_id: str, page: int) -> tuple[int, Embed | None] | None:
+    """
+    Load the page count and a page of a persistent pagination from the cache.
+
+    :param source_id: id of the page source
+    :param page: index of the page
+    :return: None if the pagination has expired, otherwise the page count and the page (None if out of range)
+    """
+
+    async with cache.pipeline() as pipe:
+        meta, data = await pipe.get(f"pagination:{source_id}").get(f"pagination:{source_id}:{page}").execute()
+
+    if meta is None:
+        return None
+
+    meta = json.loads(meta)
+    if page not in range(meta["count"]):
+        return meta["count"], None
+
+    if "renderer" in meta:
+        if meta["renderer"] not in _page_renderers:
+            return None
+        return meta["count"], await RendererPageSource(meta["renderer"], meta["args"], meta["count"]).get_page(page)
+
+    if data is None:
+        return None
+
+    return meta["count"], Embed.from_dict(json.loads(data))
+
+
+async def handle_pagination_interaction(interaction: Interaction) -> None:
+    """Dispatch a click on a button of a persistent pagination (registered as on_interaction listener)."""
+
+    if interaction.type != InteractionType.component or not interaction.data:
+        return
+
+    prefix, _, source_id, page, user_id = (str(interaction.data.get("custom_id", "")).split(":") + [""] * 5)[:5]
+    if prefix != PAGINATION_CUSTOM_ID or not page.isnumeric() or not user_id.isnumeric():
+        return
+
+    await _handle_pagination_click(interaction, source_id, int(page), int(user_id))
+
+
+@db_wrapper
+async def _handle_pagination_click(interaction: Interaction, source_id: str, page: int, user_id: int) -> None:
+    # acknowledge the interaction first, as loading or rendering the page might exceed the interaction deadline
+    await interaction.response.defer()
+
+    if message := await check_maintenance(interaction.user):
+        await interaction.followup.send(message, ephemeral=True)
+        return
+
+    if not (loaded := await _load_page(source_id, page)):
+        # pagination has expired
+        await interaction.edit_original_response(view=None)
+        return
+
+    count, embed = loaded
+    if embed is None:
+        # the button does not point to an existing page, so the message is kept as it is
+        return
+
+    if user_id and interaction.user and user_id != interaction.user.id:
+        # other users get their own pagination of the same page source
+        view = _persistent_view(source_id, page, count, interaction.user.id)
+        try:
+            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+        finally:
+            view.stop()
+        return
+
+    view = _persistent_view(source_id, page, count, user_id)
+    try:
+        await interaction.edit_original_response(embed=embed, view=view)
+    finally:
+        view.stop()
@@ -16,7 +16,7 @@ from sqlalchemy.orm import Mapped
 
 from PyDrocsid.database import Base, db
 from PyDrocsid.environment import CACHE_TTL
-from PyDrocsid.redis_client import redis
+from PyDrocsid.redis_client import local_cache
 from PyDrocsid.translations import t
 
 
@@ -40,13 +40,13 @@ class PermissionModel(Base):
     async def get(permission: str, default: int) -> int:
         """Get the configured level of a given permission."""
 
-        if (value := await redis.get(rkey := f"permissions:{permission}")) is not None:
+        if (value := await local_cache.get(rkey := f"permissions:{permission}")) is not None:
             return int(value)
 
         if (row := await db.get(PermissionModel, permission=permission)) is None:
             row = await PermissionModel.create(permission, default)
 
-        await redis.setex(rkey, CACHE_TTL, row.level)
+        await local_cache.setex(rkey, CACHE_TTL, row.level)
 
         return row.level
 
@@ -54,7 +54,7 @@ class PermissionModel(Base):
     async def set(permission: str, level: int) -> PermissionModel:
         """Configure the level of a given permission."""
 
-        await redis.setex(f"permissions:{permission}", CACHE_TTL, level)
+        await local_cache.setex(f"permissions:{permission}", CACHE_TTL, level)
 
         if (row := await db.get(PermissionModel, permission=permission)) is None:
             return await PermissionModel.create(permission, level)
@@ -59,7 +59,9 @@ class PubSubChannel(Generic[PubSubArgs, PubSubResult]):
     __call__ = publish
 
     @property
-    def subscribe(self) -> Type[Subscription[PubSubArgs, PubSubResult]]:
+    def subscribe(
+        self,
+    ) -> Callable[[Callable[..., Awaitable[PubSubResult | None]]], Subscription[PubSubArgs, PubSubResult]]:
         """
         Decorator for async functions to register them as subscriptions of this channel.
         Can only be used on methods of Cog classes.
@@ -68,6 +70,7 @@ class PubSubChannel(Generic[PubSubArgs, PubSubResult]):
         class Sub(Subscription[PubSubArgs, PubSubResult]):  # type: ignore
             channel = self
 
+        # the return type is a callable instead of a class, as mypy treats class decorators as untyped
         return Sub
 
     def register(self, subscription: Subscription[PubSubArgs, PubSubResult]) -> None:
@@ -1,11 +1,186 @@
-from typing import Callable, cast
+from asyncio import Task, create_task, sleep
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import Any, AsyncIterator, Callable, cast
 
 from redis.asyncio import Redis, from_url
 
-from PyDrocsid.environment import REDIS_DB, REDIS_HOST, REDIS_PORT
+from PyDrocsid.cache_backend import CacheBackend, CachePipeline
+from PyDrocsid.environment import (
+    CACHE_BACKEND,
+    LOCAL_CACHE_MAX_AGE,
+    LOCAL_CACHE_PREFIXES,
+    LOCAL_CACHE_SIZE,
+    REDIS_DB,
+    REDIS_HEALTH_CHECK_INTERVAL,
+    REDIS_HOST,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_PORT,
+    REDIS_SOCKET_CONNECT_TIMEOUT,
+    REDIS_SOCKET_TIMEOUT,
+)
+from PyDrocsid.logger import get_logger
+from PyDrocsid.memory_cache import MemoryCache
+
+
+logger = get_logger(__name__)
 
+# pub/sub channel used to broadcast invalidations of locally cached keys to all nodes
+INVALIDATION_CHANNEL = "pydrocsid:invalidate"
 
-# global redis connection
+
+# global redis connection (a full redis client, independent of CACHE_BACKEND)
 redis: Redis = cast(Callable[..., Redis], from_url)(
-    f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}", encoding="utf-8", decode_responses=True
+    f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}",
+    encoding="utf-8",
+    decode_responses=True,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
+    health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
 )
+
+
+def create_cache_backend(backend: str) -> CacheBackend:
+    """
+    Create the cache backend used by PyDrocsid.
+
+    :param backend: "redis" for the redis connection, "memory" for a process-local cache (single node deployments
+                    and tests)
+    """
+
+    if backend == "memory":
+        return MemoryCache()
+    if backend != "redis":
+        raise ValueError(f"Unknown cache backend: {backend}")
+
+    # redis-py types commands as "Awaitable | Any" (also in pipelines), so mypy can't match them against the protocol
+    return cast(CacheBackend, redis)
+
+
+# global cache backend (the redis connection or a process-local cache, depending on CACHE_BACKEND)
+cache: CacheBackend = create_cache_backend(CACHE_BACKEND)
+
+
+@asynccontextmanager
+async def pipeline(*, transaction: bool = True) -> AsyncIterator[CachePipeline]:
+    """
+    Queue multiple cache commands and send them in a single round trip when the context is left.
+    Use cache.pipeline() directly if the results of the commands are needed.
+
+    :param transaction: whether to execute the commands atomically (MULTI/EXEC)
+    """
+
+    async with cache.pipeline(transaction=transaction) as pipe:
+        yield pipe
+        await pipe.execute()
+
+
+class LocalCache:
+    """
+    Bounded process-local LRU cache in front of redis for hot keys which change rarely.
+
+    Entries are invalidated by messages on INVALIDATION_CHANNEL (published by setex/delete of this class on any
+    node) and by keyspace notifications (if enabled on the redis server, e.g. for expirations or external changes).
+    Keys are only cached locally while the invalidation listener is connected, and every entry expires after
+    max_age seconds as a safety net against missed invalidations.
+    """
+
+    def __init__(self, size: int, max_age: float, prefixes: list[str]):
+        """
+        :param size: maximum number of locally cached keys (0 to disable the local cache)
+        :param max_age: maximum number of seconds a key is cached locally
+        :param prefixes: only keys starting with one of these prefixes are cached locally
+        """
+
+        self.size = size
+        self.max_age = max_age
+        self.prefixes = tuple(prefixes)
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._generation = 0  # incremented on every invalidation
+        self._ready = False
+        self._task: Task[None] | None = None
+
+    def _cacheable(self, key: str) -> bool:
+        return self.size > 0 and key.startswith(self.prefixes)
+
+    def invalidate(self, key: str) -> None:
+        self._generation += 1
+        self._entries.pop(key, None)
+
+    async def get(self, key: str) -> Any:
+        """Get the value of a key from the local cache or from redis."""
+
+        if not self._cacheable(key):
+            return await cache.get(key)
+
+        if not self._task:
+            self._task = create_task(self._listen())
+
+        if (entry := self._entries.get(key)) is not None:
+            if entry[0] > monotonic():
+                self._entries.move_to_end(key)
+                return entry[1]
+            del self._entries[key]
+
+        generation = self._generation
+        value = await cache.get(key)
+
+        # don't cache values which might have been invalidated while waiting for redis
+        if value is not None and self._ready and generation == self._generation:
+            self._entries[key] = (monotonic() + self.max_age, value)
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+        return value
+
+    async def setex(self, key: str, seconds: int, value: Any) -> None:
+        """Set the value of a key in redis and invalidate it on all nodes."""
+
+        self.invalidate(key)
+        if not self._cacheable(key):
+            await cache.setex(key, seconds, value)
+            return
+
+        async with pipeline() as pipe:
+            pipe.setex(key, seconds, value)
+            pipe.publish(INVALIDATION_CHANNEL, key)
+
+    async def delete(self, key: str) -> None:
+        """Delete a key from redis and invalidate it on all nodes."""
+
+        self.invalidate(key)
+        async with pipeline() as pipe:
+            pipe.delete(key)
+            pipe.publish(INVALIDATION_CHANNEL, key)
+
+    async def _listen(self) -> None:
+        keyspace_prefix = f"__keyspace@{REDIS_DB}__:"
+        while True:
+            try:
+                # the pubsub connection is released when the listener disconnects
+                async with cache.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    await pubsub.psubscribe(*[keyspace_prefix + prefix + "*" for prefix in self.prefixes])
+
+                    # entries cached before the listener was connected might have missed invalidations
+                    self._entries.clear()
+                    self._ready = True
+
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.invalidate(message["data"])
+                        elif message["type"] == "pmessage":
+                            self.invalidate(message["channel"].removeprefix(keyspace_prefix))
+            except Exception as e:  # noqa: B902
+                logger.warning("Local cache invalidation listener disconnected: %s", e)
+            finally:
+                self._ready = False
+                self._entries.clear()
+
+            await sleep(1)
+
+
+# local cache for hot keys (not needed if the cache backend already is process-local)
+local_cache = LocalCache(LOCAL_CACHE_SIZE if CACHE_BACKEND == "redis" else 0, LOCAL_CACHE_MAX_AGE, LOCAL_CACHE_PREFIXES)
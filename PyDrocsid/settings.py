@@ -9,7 +9,7 @@ from sqlalchemy.orm import Mapped
 from PyDrocsid.async_thread import lock_deco
 from PyDrocsid.database import Base, db
 from PyDrocsid.environment import CACHE_TTL
-from PyDrocsid.redis_client import redis
+from PyDrocsid.redis_client import local_cache
 
 
 if not TYPE_CHECKING:
@@ -41,11 +41,11 @@ class SettingsModel(Base):
             if (row := await db.get(SettingsModel, key=key)) is None:
                 row = await SettingsModel._create(key, default)
             out = row.value  # type: ignore
-        elif (out := await redis.get(rkey := f"settings:{key}")) is None:
+        elif (out := await local_cache.get(rkey := f"settings:{key}")) is None:
             if (row := await db.get(SettingsModel, key=key)) is None:
                 row = await SettingsModel._create(key, default)
             out = row.value  # type: ignore
-            await redis.setex(rkey, CACHE_TTL, out)
+            await local_cache.setex(rkey, CACHE_TTL, out)
 
         return dtype(int(out) if dtype is bool else out)
 
@@ -64,11 +64,11 @@ class SettingsModel(Base):
         rkey = f"settings:{key}"
         if (row := await db.get(SettingsModel, key=key)) is None:
             row = await SettingsModel._create(key, value)
-            await redis.setex(rkey, CACHE_TTL, row.value)
+            await local_cache.setex(rkey, CACHE_TTL, row.value)
             return row
 
         row.value = str(int(value) if dtype is bool else value)
-        await redis.setex(rkey, CACHE_TTL, row.value)
+        await local_cache.setex(rkey, CACHE_TTL, row.value)
         return row
 
 
@@ -0,0 +1,38 @@
+from discord.ext.commands.bot import Bot
+
+from PyDrocsid.database import write_behind
+from PyDrocsid.embeds import log_sink
+from PyDrocsid.http_client import close_session
+from PyDrocsid.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+async def close_resources() -> None:
+    """Write all buffered data and release shared resources. Called once when the bot is closed."""
+
+    try:
+        await log_sink.close()
+    except Exception:  # noqa: B902
+        logger.exception("Could not send the buffered log entries on shutdown")
+
+    try:
+        await write_behind.close()
+    except Exception:  # noqa: B902
+        logger.exception("Could not flush the write-behind buffer on shutdown")
+
+    await close_session()
+
+
+def register_shutdown(bot: Bot) -> None:
+    """Call close_resources before the connection of the bot is closed."""
+
+    close = bot.close
+
+    async def inner() -> None:
+        if not bot.is_closed():
+            await close_resources()
+        await close()
+
+    bot.close = inner  # type: ignore
@@ -18,6 +18,7 @@ from discord import (
     Interaction,
     Member,
     Message,
+    NotFound,
     PartialEmoji,
     Permissions,
     Role,
@@ -30,6 +31,7 @@ from discord.ext.commands.errors import CommandError
 
 from PyDrocsid.bot_mode import BotMode
 from PyDrocsid.config import Config
+from PyDrocsid.edit_coalescer import edit_coalescer
 from PyDrocsid.emojis import name_to_emoji
 from PyDrocsid.environment import OWNER_IDS, SUDOERS
 from PyDrocsid.permission import BasePermission
@@ -226,6 +228,33 @@ async def read_complete_message(message: Message) -> tuple[str, list[File], Embe
     return message.content, [await attachment_to_file(attachment) for attachment in message.attachments], embed
 
 
+# last log message sent or edited by send_editable_log in each channel
+_last_log_messages: dict[int, Message] = {}
+
+
+def invalidate_log_message(channel_id: int, message_id: int, *, deleted: bool = False) -> None:
+    """
+    Forget the cached last log message of a channel if another message has been sent into the channel
+    or if the log message has been deleted.
+
+    :param channel_id: the channel id
+    :param message_id: the id of the new or deleted message
+    :param deleted: whether the message has been deleted
+    """
+
+    if (last := _last_log_messages.get(channel_id)) is None:
+        return
+
+    # message ids are increasing, so older messages (e.g. delayed events) do not invalidate the log message
+    if last.id == message_id if deleted else message_id > last.id:
+        del _last_log_messages[channel_id]
+
+
+def _remember_log_message(message: Message) -> Message:
+    _last_log_messages[message.channel.id] = message
+    return message
+
+
 async def send_editable_log(
         channel: Messageable,
         title: str,
@@ -253,10 +282,19 @@ async def send_editable_log(
     :param force_new_field: whether to always create a new field instead of editing the last field
     """
 
-    messages: list[Message] = await channel.history(limit=1).flatten()
+    # use the cached log message if no other message has been sent into the channel since then
+    messages: list[Message]
+    if (last := _last_log_messages.get(cast(Any, channel).id)) is not None:
+        messages = [last]
+    else:
+        messages = await channel.history(limit=1).flatten()
+
     edited = False
     if messages and messages[0].embeds and not force_new_embed:  # can extend last embed
         embed: Embed = messages[0].embeds[0]
+        if (pending := edit_coalescer.get_pending(messages[0])) and "embed" in pending:
+            # the last edit has not been applied yet
+            embed = pending["embed"]
 
         # if name or description don't match, a new embed must be created
         if (embed.title or "") == title and (embed.description or "") == description:
@@ -282,21 +320,26 @@ async def send_editable_log(
             if not force_new_embed:
                 if force_resend:
                     await messages[0].delete()
-                    return await channel.send(embed=embed, **kwargs)
-                await messages[0].edit(embed=embed, **kwargs)
-                return messages[0]
+                    return _remember_log_message(await channel.send(embed=embed, **kwargs))
+                try:
+                    return _remember_log_message(await edit_coalescer.edit(messages[0], embed=embed, **kwargs))
+                except NotFound:
+                    # cached log message has been deleted -> send a new embed
+                    invalidate_log_message(messages[0].channel.id, messages[0].id, deleted=True)
             elif edited:
                 if force_resend:
                     await messages[0].delete()
                     await channel.send(embed=embed, **kwargs)
-                await messages[0].edit(embed=embed, **kwargs)
+                await edit_coalescer.edit(messages[0], embed=embed, **kwargs)
 
     # create and send a new embed
     embed = Embed(title=title, description=description, colour=colour if colour is not None else 0x008080)
     for name, value in fields:
         embed.add_field(name=name, value=value, inline=inline)
     from PyDrocsid.embeds import send_long_embed
-    return (await send_long_embed(channel, embed, repeat_title=True))[0]
+    sent = await send_long_embed(channel, embed, repeat_title=True)
+    _remember_log_message(sent[-1])
+    return sent[0]
 
 
 def check_role_assignable(role: Role) -> None:
@@ -0,0 +1,97 @@
+"""
+Benchmark of the cached select/filter_by helpers against building the statements on every call.
+
+Run with ``python -m benchmarks.select``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from time import perf_counter
+from typing import Any, Callable
+
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Mapped, relationship
+from sqlalchemy.sql.selectable import Select
+
+from PyDrocsid.database import Base, filter_by
+from PyDrocsid.database.database import _cached_select, _normalize_load_path
+
+
+class BenchParent(Base):
+    __tablename__ = "bench_select_parent"
+
+    id = Column(BigInteger, primary_key=True)
+    kind = Column(Integer)
+    children: Mapped[list[BenchChild]] = relationship("BenchChild", back_populates="parent")
+
+
+class BenchChild(Base):
+    __tablename__ = "bench_select_child"
+
+    id = Column(BigInteger, primary_key=True)
+    parent_id = Column(BigInteger, ForeignKey("bench_select_parent.id"))
+    parent: Mapped[BenchParent] = relationship("BenchParent", back_populates="children")
+    grandchildren: Mapped[list[BenchGrandchild]] = relationship("BenchGrandchild")
+
+
+class BenchGrandchild(Base):
+    __tablename__ = "bench_select_grandchild"
+
+    id = Column(BigInteger, primary_key=True)
+    child_id = Column(BigInteger, ForeignKey("bench_select_child.id"))
+
+
+def uncached_filter_by(cls: Any, *args: Any, **kwargs: Any) -> Select:
+    """filter_by without the statement cache (the previous implementation)."""
+
+    return _cached_select.__wrapped__(cls, *map(_normalize_load_path, args)).filter_by(**kwargs)
+
+
+STATEMENTS: dict[str, Callable[[Callable[..., Select], int], Select]] = {
+    "no options": lambda f, i: f(BenchParent, id=i),
+    "two selectinload levels": lambda f, i: f(
+        BenchParent, [BenchParent.children, BenchChild.grandchildren], id=i, kind=1
+    ),
+}
+
+
+def bench(name: str, func: Callable[[], Any], number: int) -> None:
+    start = perf_counter()
+    for _ in range(number):
+        func()
+    print(f"  {name:<22} {(perf_counter() - start) / number * 1e6:8.1f} us")
+
+
+async def bench_queries(session: AsyncSession, name: str, factory: Callable[[int], Select], number: int) -> None:
+    start = perf_counter()
+    for i in range(number):
+        (await session.execute(factory(i % 100))).scalars().all()
+    print(f"  {name:<22} {(perf_counter() - start) / number * 1e6:8.1f} us")
+
+
+async def main() -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    tables = [BenchParent.__table__, BenchChild.__table__, BenchGrandchild.__table__]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+        await conn.execute(BenchParent.__table__.insert(), [{"id": i, "kind": i % 2} for i in range(100)])
+        await conn.execute(BenchChild.__table__.insert(), [{"id": i, "parent_id": i % 100} for i in range(300)])
+        await conn.execute(BenchGrandchild.__table__.insert(), [{"id": i, "child_id": i % 300} for i in range(600)])
+
+    for name, statement in STATEMENTS.items():
+        print(f"{name}: statement construction")
+        bench("before (uncached)", lambda: statement(uncached_filter_by, 1), 20000)
+        bench("after (cached)", lambda: statement(filter_by, 1), 20000)
+
+        print(f"{name}: construction + execution on in-memory sqlite")
+        async with AsyncSession(engine) as session:
+            await bench_queries(session, "before (uncached)", lambda i: statement(uncached_filter_by, i), 2000)
+            await bench_queries(session, "after (cached)", lambda i: statement(filter_by, i), 2000)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
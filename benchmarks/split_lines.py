@@ -0,0 +1,81 @@
+"""
+Benchmark of embeds.split_lines on large inputs.
+
+Run with ``python -m benchmarks.split_lines``.
+"""
+
+import random
+from timeit import repeat
+from typing import Callable
+
+from PyDrocsid.embeds import EmbedLimits, iter_split_lines, split_lines
+
+
+def _reference_split_lines(text: str, max_size: int) -> list[str]:
+    """Previous implementation of split_lines (before the lazy splitter), for comparison."""
+
+    text = text.strip(" \n")
+    ms = max_size
+    out: list[str] = []
+    i = 0
+    while i + ms < len(text):
+        j = text.rfind("\n", i, i + ms + 1)
+        if j == -1:
+            j = text.rfind(". ", i, i + ms + 1) + 1
+        if j == -1:
+            j = text.rfind(" ", i, i + ms + 1)
+
+        if j == -1:
+            j = i + ms
+            out.append(text[i:j])
+            i = j
+        else:
+            out.append(text[i:j])
+            i = j + 1
+
+    return [y for x in out + [text[i:]] if (y := x.strip(" \n"))]
+
+
+def generate(size: int, words: bool = True, lines: bool = True, seed: int = 0) -> str:
+    """Generate a random text of the given size."""
+
+    rnd = random.Random(seed)
+    out: list[str] = []
+    length = 0
+    while length < size:
+        word = "".join(rnd.choices("abcdefghijklmnopqrstuvwxyz", k=rnd.randint(1, 12)))
+        sep = rnd.choice([" "] * 12 + [". "] * 2 + ["\n"] * lines) if words else ""
+        out.append(word + sep)
+        length += len(word) + len(sep)
+    return "".join(out)[:size]
+
+
+# name -> (text, whether to run the reference implementation)
+INPUTS: dict[str, tuple[str, bool]] = {
+    "prose 100k": (generate(100_000), True),
+    "prose 1M": (generate(1_000_000), True),
+    "single line 1M": (generate(1_000_000, lines=False), True),
+    # the reference implementation never terminates on text without separators
+    "no separators 100k": (generate(100_000, words=False), False),
+    "no separators 1M": (generate(1_000_000, words=False), False),
+}
+
+
+def bench(name: str, func: Callable[[], object], number: int = 5) -> None:
+    best = min(repeat(func, number=number, repeat=3)) / number
+    print(f"  {name:<20} {best * 1000:9.2f} ms")
+
+
+def main() -> None:
+    for name, (text, reference) in INPUTS.items():
+        print(f"{name} ({len(text)} characters)")
+        for max_size in (EmbedLimits.FIELD_VALUE, EmbedLimits.DESCRIPTION):
+            print(f" max_size={max_size}")
+            bench("split_lines", lambda: split_lines(text, max_size))
+            bench("first chunk (lazy)", lambda: next(iter_split_lines(text, max_size)))
+            if reference:
+                bench("reference", lambda: _reference_split_lines(text, max_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import asyncio
+import os
+from tempfile import mkdtemp
+from typing import Any, Callable, Coroutine, TypeVar
+
+import pytest
+
+
+T = TypeVar("T")
+
+# use a process-local cache and a temporary sqlite database, so the tests don't need any servers
+os.environ.update(
+    CACHE_BACKEND="memory",
+    DB_DRIVER="sqlite+aiosqlite",
+    DB_HOST="",
+    DB_PORT="0",
+    DB_USERNAME="",
+    DB_PASSWORD="",
+    DB_DATABASE=os.path.join(mkdtemp(), "test.db"),
+)
+
+
+@pytest.fixture
+def run() -> Callable[[Coroutine[Any, Any, T]], T]:
+    """Run a coroutine in a new event loop and close all database connections afterwards."""
+
+    from PyDrocsid.database import db
+
+    async def inner(coro: Coroutine[Any, Any, T]) -> T:
+        try:
+            return await coro
+        finally:
+            await db.engine.dispose()
+
+    return lambda coro: asyncio.run(inner(coro))
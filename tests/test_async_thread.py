@@ -0,0 +1,73 @@
+from asyncio import run, sleep
+from typing import AsyncIterator, Iterator
+
+import pytest
+
+from PyDrocsid.async_thread import semaphore_gather, stream_gather
+
+
+async def job(i: int, fail: int | None = None) -> int:
+    await sleep(0.001 * (i % 3))
+    if i == fail:
+        raise ValueError(i)
+    return i * 2
+
+
+def test_semaphore_gather_runs_all_tasks_on_failure() -> None:
+    done: list[int] = []
+
+    async def track(i: int) -> None:
+        await job(i, fail=1)
+        done.append(i)
+
+    async def main() -> None:
+        with pytest.raises(ValueError):
+            await semaphore_gather(3, *[track(i) for i in range(10)])
+        await sleep(0.05)
+
+    run(main())
+    assert sorted(done) == [0, *range(2, 10)]
+
+
+def test_stream_gather_ordered() -> None:
+    async def main() -> list[tuple[int, int | Exception]]:
+        return [x async for x in stream_gather(4, (job(i) for i in range(100)), ordered=True)]
+
+    assert run(main()) == [(i, i * 2) for i in range(100)]
+
+
+def test_stream_gather_async_iterable() -> None:
+    async def items() -> AsyncIterator[object]:
+        for i in range(20):
+            yield job(i)
+
+    async def main() -> list[tuple[int, int | Exception]]:
+        return [x async for x in stream_gather(3, items())]  # type: ignore
+
+    assert sorted(run(main())) == [(i, i * 2) for i in range(20)]
+
+
+def test_stream_gather_is_lazy_and_cancels_on_failure() -> None:
+    created = 0
+
+    def items() -> Iterator[object]:
+        nonlocal created
+        for i in range(1000):
+            created += 1
+            yield job(i, fail=5)
+
+    async def main() -> None:
+        with pytest.raises(ValueError):
+            [x async for x in stream_gather(3, items())]  # type: ignore
+
+    run(main())
+    assert created < 20
+
+
+def test_stream_gather_return_exceptions() -> None:
+    async def main() -> dict[int, int | Exception]:
+        return dict([x async for x in stream_gather(3, (job(i, fail=2) for i in range(5)), return_exceptions=True)])
+
+    results = run(main())
+    assert isinstance(results.pop(2), ValueError)
+    assert results == {0: 0, 1: 2, 3: 6, 4: 8}
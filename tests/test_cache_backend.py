@@ -0,0 +1,53 @@
+from asyncio import run
+
+import pytest
+from redis.asyncio import Redis  # type: ignore[import]
+from redis.asyncio.client import Pipeline, PubSub  # type: ignore[import]
+
+from PyDrocsid import redis_client
+from PyDrocsid.cache_backend import CacheBackend, CachePipeline, CachePubSub
+from PyDrocsid.memory_cache import MemoryCache, MemoryPipeline, MemoryPubSub
+
+
+def members(protocol: type) -> set[str]:
+    return {name for name in vars(protocol) if not name.startswith("_") or name in ("__aenter__", "__aexit__")} - {
+        "__annotations__",
+        "__parameters__",
+        "__protocol_attrs__",
+        "__non_callable_proto_members__",
+    }
+
+
+@pytest.mark.parametrize(
+    "protocol,implementations",
+    [
+        (CacheBackend, [Redis, MemoryCache]),
+        (CachePipeline, [Pipeline, MemoryPipeline]),
+        (CachePubSub, [PubSub, MemoryPubSub]),
+    ],
+)
+def test_backends_implement_protocol(protocol: type, implementations: list[type]) -> None:
+    for implementation in implementations:
+        assert not [name for name in members(protocol) if not callable(getattr(implementation, name, None))]
+
+
+def test_memory_pipeline() -> None:
+    async def main() -> None:
+        cache = MemoryCache()
+        async with cache.pipeline() as pipe:
+            result = (
+                await pipe.setex("a", 10, 1).rpush("b", "x", "y").incr("c", 2).get("a").lrange("b", 0, -1).execute()
+            )
+        assert result == [True, 2, 2, "1", ["x", "y"]]
+        assert await cache.ttl("a") == 10
+
+    run(main())
+
+
+def test_redis_is_a_full_client() -> None:
+    # the cache backend is configurable, the global redis connection always supports all redis commands
+    assert isinstance(redis_client.redis, Redis)
+    assert isinstance(redis_client.cache, MemoryCache)
+    assert redis_client.create_cache_backend("redis") is redis_client.redis
+    with pytest.raises(ValueError):
+        redis_client.create_cache_backend("unknown")
@@ -0,0 +1,98 @@
+import base64
+import json
+from asyncio import run
+from typing import Any
+
+import pytest
+from aiohttp import ClientConnectionError
+
+from PyDrocsid import discohook
+from PyDrocsid.discohook import DiscoHookError, InvalidLinkError, load_discohook_link
+from PyDrocsid.redis_client import cache
+
+
+class FakeResponse:
+    def __init__(self, status: int, url: str):
+        self.status = status
+        self.ok = status < 400
+        self.url = url
+
+    async def __aenter__(self) -> "FakeResponse":
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        pass
+
+
+class FakeSession:
+    def __init__(self, status: int = 200, url: str = "", error: Exception | None = None):
+        self.status = status
+        self.url = url
+        self.error = error
+        self.requests = 0
+
+    def head(self, link: str, **_: Any) -> FakeResponse:
+        self.requests += 1
+        if self.error:
+            raise self.error
+        return FakeResponse(self.status, self.url)
+
+
+def use_session(monkeypatch: pytest.MonkeyPatch, session: FakeSession) -> FakeSession:
+    monkeypatch.setattr(discohook, "get_session", lambda: session)
+    return session
+
+
+def discohook_url(content: str) -> str:
+    data = json.dumps({"messages": [{"data": {"content": content}}]})
+    return "https://discohook.org/?data=" + base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+async def is_marked_invalid(link: str) -> bool:
+    return bool(await cache.exists(f"discohook:invalid:{discohook._hash(link)}"))
+
+
+def test_valid_link_is_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = use_session(monkeypatch, FakeSession(url=discohook_url("hello")))
+
+    async def main() -> None:
+        link = "https://share.discohook.app/go/valid"
+        for _ in range(2):
+            [message] = await load_discohook_link(link)
+            assert message.content == "hello"
+
+    run(main())
+    assert session.requests == 1
+
+
+@pytest.mark.parametrize("status,url", [(404, ""), (200, "https://discohook.org/")])
+def test_invalid_link_is_marked(monkeypatch: pytest.MonkeyPatch, status: int, url: str) -> None:
+    session = use_session(monkeypatch, FakeSession(status=status, url=url))
+
+    async def main() -> None:
+        link = f"https://share.discohook.app/go/invalid-{status}"
+        for _ in range(2):
+            with pytest.raises(InvalidLinkError):
+                await load_discohook_link(link)
+        assert await is_marked_invalid(link)
+
+    run(main())
+    assert session.requests == 1
+
+
+@pytest.mark.parametrize(
+    "session", [FakeSession(status=503), FakeSession(status=429), FakeSession(error=ClientConnectionError())]
+)
+def test_temporary_errors_are_not_cached(monkeypatch: pytest.MonkeyPatch, session: FakeSession) -> None:
+    use_session(monkeypatch, session)
+
+    async def main() -> None:
+        link = f"https://share.discohook.app/go/outage-{id(session)}"
+        for _ in range(2):
+            with pytest.raises(DiscoHookError) as e:
+                await load_discohook_link(link)
+            assert not isinstance(e.value, InvalidLinkError)
+        assert not await is_marked_invalid(link)
+
+    run(main())
+    assert session.requests == 2
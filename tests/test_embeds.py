@@ -0,0 +1,137 @@
+from discord import Embed
+
+from PyDrocsid.embeds import EMPTY_MARKDOWN, EmbedLimits, layout_embed, pack_embeds
+
+
+def check_limits(embed: Embed) -> None:
+    assert len(embed) <= EmbedLimits.TOTAL
+    assert len(embed.description or "") <= EmbedLimits.DESCRIPTION
+    assert len(embed.fields) <= EmbedLimits.FIELDS
+    assert all(len(field.value or "") <= EmbedLimits.FIELD_VALUE for field in embed.fields)
+
+
+def test_description_at_limits() -> None:
+    embed = Embed(description="a" * EmbedLimits.DESCRIPTION)
+    embed.add_field(name="b", value="b" * EmbedLimits.FIELD_VALUE)
+    embed.add_field(name="c", value="c" * (EmbedLimits.TOTAL - EmbedLimits.DESCRIPTION - EmbedLimits.FIELD_VALUE - 2))
+    assert len(embed) == EmbedLimits.TOTAL
+
+    [out] = layout_embed(embed)
+    assert out.description == embed.description
+    assert [field.value for field in out.fields] == [field.value for field in embed.fields]
+
+    # one more character does not fit
+    embed.set_field_at(1, name="c", value=embed.fields[1].value + "c")
+    first, second = layout_embed(embed)
+    assert first.description == embed.description and len(first.fields) == 1
+    assert [field.name for field in second.fields] == ["c"]
+
+
+def test_description_is_split() -> None:
+    lines = ["x" * 1000] * 9
+    [*parts, last] = layout_embed(Embed(description="\n".join(lines)))
+
+    for embed in parts:
+        check_limits(embed)
+        assert len(embed.description or "") > EmbedLimits.DESCRIPTION - 1001
+    assert [embed.description for embed in [*parts, last]] == ["\n".join(lines[:4])] * 2 + [lines[0]]
+
+
+def test_fields_are_split_across_embeds() -> None:
+    embed = Embed(title="title")
+    for i in range(30):
+        embed.add_field(name=f"field {i}", value=str(i))
+
+    out = list(layout_embed(embed))
+    assert [len(e.fields) for e in out] == [25, 5]
+    assert [field.value for e in out for field in e.fields] == [str(i) for i in range(30)]
+
+    out = list(layout_embed(embed, max_fields=10))
+    assert [len(e.fields) for e in out] == [10, 10, 10]
+
+    # fields are moved to the next embed as a whole if they do not fit into the current one
+    embed = Embed()
+    for i in range(7):
+        embed.add_field(name=f"f{i}", value="x" * 1000)
+    out = list(layout_embed(embed))
+    assert [[field.name for field in e.fields] for e in out] == [[f"f{i}" for i in range(5)], ["f5", "f6"]]
+    for e in out:
+        check_limits(e)
+
+
+def test_long_field_is_split() -> None:
+    embed = Embed()
+    embed.add_field(name="long", value="\n".join(["x" * 1000] * 3), inline=True)
+
+    [out] = layout_embed(embed)
+    check_limits(out)
+    assert [field.name for field in out.fields] == ["long", EMPTY_MARKDOWN, EMPTY_MARKDOWN]
+    assert not any(field.inline for field in out.fields)
+
+
+def test_footer_and_image_only_on_last_embed() -> None:
+    embed = Embed(title="title")
+    embed.set_footer(text="footer")
+    embed.set_image(url="https://example.com/image.png")
+    embed.set_thumbnail(url="https://example.com/thumbnail.png")
+    for i in range(60):
+        embed.add_field(name=f"field {i}", value=str(i))
+
+    first, *middle, last = [e.to_dict() for e in layout_embed(embed)]
+    assert len(middle) == 1
+    assert first["title"] == "title" and "thumbnail" in first
+    for e in [first, *middle]:
+        assert "footer" not in e and "image" not in e
+    for e in [*middle, last]:
+        assert "title" not in e and "thumbnail" not in e
+    assert last["footer"] == {"text": "footer"}
+    assert last["image"] == {"url": "https://example.com/image.png"}
+
+    out = layout_embed(embed, repeat_title=True, repeat_footer=True, repeat_image=True, repeat_thumbnail=True)
+    for e in map(Embed.to_dict, out):
+        assert e["title"] == "title" and e["footer"] == last["footer"] and e["image"] == last["image"]
+        assert e["thumbnail"] == first["thumbnail"]
+
+
+def test_footer_which_does_not_fit_starts_new_embed() -> None:
+    embed = Embed(description="a" * EmbedLimits.DESCRIPTION)
+    embed.add_field(name="b", value="b" * (EmbedLimits.TOTAL - EmbedLimits.DESCRIPTION - 1 - 1024))
+    embed.add_field(name="c", value="c" * 1020)
+    embed.set_footer(text="footer")
+
+    first, last = layout_embed(embed)
+    assert len(first) == EmbedLimits.TOTAL - 3 and not first.footer
+    assert not last.fields and last.to_dict()["footer"] == {"text": "footer"}
+
+
+def test_pack_embeds_total_limit() -> None:
+    # three embeds fill a message exactly
+    embeds = [Embed(title=f"t{i}", description="x" * 1998) for i in range(7)]
+    assert [[e.title for e in message] for message in pack_embeds(embeds)] == [
+        ["t0", "t1", "t2"],
+        ["t3", "t4", "t5"],
+        ["t6"],
+    ]
+
+    embeds = [Embed(title=f"t{i}", description="x" * 1999) for i in range(5)]
+    assert [len(message) for message in pack_embeds(embeds)] == [2, 2, 1]
+
+
+def test_pack_embeds_embed_limit() -> None:
+    embeds = [Embed(title=f"t{i}") for i in range(21)]
+    messages = list(pack_embeds(embeds))
+    assert [len(message) for message in messages] == [10, 10, 1]
+    assert [e.title for message in messages for e in message] == [f"t{i}" for i in range(21)]
+
+
+def test_pack_embeds_merges_fields() -> None:
+    embeds = []
+    for i in range(30):
+        embed = Embed(title="log")
+        embed.add_field(name=f"entry {i}", value=str(i))
+        embeds.append(embed)
+
+    messages = list(pack_embeds(embeds))
+    assert [[len(e.fields) for e in message] for message in messages] == [[25, 5]]
+    for message in messages:
+        assert sum(map(len, message)) <= EmbedLimits.TOTAL
@@ -0,0 +1,100 @@
+import re
+from asyncio import gather, run
+from typing import Any
+
+import pytest
+
+from PyDrocsid import github_api
+from PyDrocsid.github_api import get_repo_description, get_users
+from PyDrocsid.redis_client import cache
+
+
+class FakeResponse:
+    def __init__(self, body: dict[str, Any]):
+        self.status = 200
+        self.headers: dict[str, str] = {}
+        self.body = body
+
+    async def json(self) -> dict[str, Any]:
+        return self.body
+
+    async def __aenter__(self) -> "FakeResponse":
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        pass
+
+
+class FakeGitHub:
+    """Answers repository queries: "broken" repos fail with an error, "malformed" repos reject the whole document."""
+
+    def __init__(self) -> None:
+        self.requests: list[dict[str, Any]] = []
+
+    def post(self, url: str, *, json: dict[str, Any], **_: Any) -> FakeResponse:
+        self.requests.append(json)
+        variables = json["variables"]
+        if "malformed" in variables.values():
+            return FakeResponse({"errors": [{"message": "Parse error"}]})
+
+        data: dict[str, Any] = {}
+        errors = []
+        for alias in re.findall(r"(q\d+):", json["query"]):
+            if (name := variables.get(f"{alias}_name") or variables[f"{alias}_id"]) == "broken":
+                data[alias] = None
+                errors.append({"type": "FORBIDDEN", "path": [alias], "message": "Forbidden"})
+            elif name == "missing":
+                data[alias] = None
+                errors.append({"type": "NOT_FOUND", "path": [alias], "message": "Not found"})
+            elif name.startswith("user"):
+                data[alias] = {"id": name, "login": name, "url": f"https://github.com/{name}"}
+            else:
+                data[alias] = {"description": f"description of {name}"}
+        return FakeResponse({"data": data, "errors": errors} if errors else {"data": data})
+
+
+@pytest.fixture
+def github(monkeypatch: pytest.MonkeyPatch) -> FakeGitHub:
+    fake = FakeGitHub()
+    monkeypatch.setattr(github_api, "get_session", lambda: fake)
+    run(cache.flushdb())
+    return fake
+
+
+def test_queries_are_batched_and_cached(github: FakeGitHub) -> None:
+    async def main() -> list[Any]:
+        return [*await gather(*[get_repo_description("owner", f"repo{i}") for i in range(3)])]
+
+    assert run(main()) == [f"description of repo{i}" for i in range(3)]
+    assert run(main()) == [f"description of repo{i}" for i in range(3)]
+    assert len(github.requests) == 1
+
+
+def test_field_errors_only_affect_their_query(github: FakeGitHub) -> None:
+    async def main() -> list[Any]:
+        return [
+            *await gather(
+                get_repo_description("owner", "repo"),
+                get_repo_description("owner", "broken"),
+                get_repo_description("owner", "missing"),
+                get_users(["user1", "user2"]),
+            )
+        ]
+
+    repo, broken, missing, users = run(main())
+    assert len(github.requests) == 1
+    assert repo == "description of repo"
+    assert broken is None and missing is None
+    assert sorted(users) == ["user1", "user2"]
+
+    # failed lookups are not cached, missing ones are
+    assert run(cache.exists("github:repo:owner/broken")) == 0
+    assert run(cache.exists("github:repo:owner/missing")) == 1
+
+
+def test_rejected_document_is_split(github: FakeGitHub) -> None:
+    async def main() -> list[Any]:
+        return [*await gather(get_repo_description("owner", "repo"), get_repo_description("owner", "malformed"))]
+
+    assert run(main()) == ["description of repo", None]
+    assert len(github.requests) == 3
@@ -0,0 +1,62 @@
+from typing import Any
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from PyDrocsid import github_api, http_client
+from PyDrocsid.shutdown import close_resources
+
+
+class StubServer:
+    """Local http server which records the client port of every request."""
+
+    def __init__(self) -> None:
+        self.ports: list[int] = []
+        app = web.Application()
+        app.router.add_get("/", self.handle)
+        app.router.add_post("/graphql", self.handle)
+        self.server = TestServer(app)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.ports.append(request.transport.get_extra_info("peername")[1])  # type: ignore
+        return web.json_response({"data": {"n": len(self.ports)}})
+
+
+def test_connections_are_reused(run: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def main() -> None:
+        stub = StubServer()
+        await stub.server.start_server()
+        monkeypatch.setattr(github_api, "API_URL", str(stub.server.make_url("/graphql")))
+        try:
+            sessions = set()
+            for i in range(5):
+                session = http_client.get_session()
+                sessions.add(session)
+                async with session.get(stub.server.make_url("/")) as response:
+                    assert (await response.json())["data"]["n"] == 2 * i + 1
+
+                # other modules use the same session
+                assert await github_api.graphql("{n}") == {"n": 2 * i + 2}
+
+            assert len(sessions) == 1
+            [session] = sessions
+            assert session is http_client.get_session()
+
+            # all requests were sent over a single pooled keep-alive connection
+            assert len(stub.ports) == 10
+            assert len(set(stub.ports)) == 1
+
+            connector = session.connector
+            await close_resources()
+            assert session.closed
+            assert connector is not None and connector.closed
+            assert http_client._session is None
+
+            # a new session is created after the shared one has been closed
+            assert http_client.get_session() is not session
+        finally:
+            await http_client.close_session()
+            await stub.server.close()
+
+    run(main())
@@ -0,0 +1,55 @@
+from typing import Any
+
+from sqlalchemy import BigInteger, Column, Integer
+
+from PyDrocsid.database import Base, db, db_context, select
+
+
+class Row(Base):
+    __tablename__ = "test_iter_batches_row"
+
+    # attribute names differ from the column names
+    uid = Column("user_id", BigInteger, primary_key=True)
+    score = Column("user_score", Integer, unique=True)
+
+
+async def setup(count: int) -> None:
+    async with db.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all, tables=[Row.__table__])
+        await conn.run_sync(Base.metadata.create_all, tables=[Row.__table__])
+
+    async with db_context():
+        for i in range(count):
+            await db.add(Row(uid=i, score=-i))
+
+
+async def collect(**kwargs: Any) -> list[list[int]]:
+    async with db_context():
+        return [[row.uid for row in batch] async for batch in db.iter_batches(select(Row), **kwargs)]
+
+
+def test_primary_key_with_different_attribute_name(run: Any) -> None:
+    async def main() -> None:
+        await setup(7)
+        assert await collect(batch_size=3) == [[0, 1, 2], [3, 4, 5], [6]]
+        assert await collect(batch_size=7) == [[0, 1, 2, 3, 4, 5, 6]]
+
+    run(main())
+
+
+def test_order_by_column_and_attribute(run: Any) -> None:
+    async def main() -> None:
+        await setup(5)
+        expected = [[4, 3], [2, 1], [0]]
+        assert await collect(batch_size=2, order_by=Row.__table__.c.user_score) == expected
+        assert await collect(batch_size=2, order_by=Row.score) == expected
+
+    run(main())
+
+
+def test_empty_table(run: Any) -> None:
+    async def main() -> None:
+        await setup(0)
+        assert await collect() == []
+
+    run(main())
@@ -0,0 +1,54 @@
+from asyncio import Event, gather, run, sleep
+
+from discord import Embed
+
+from PyDrocsid.embeds import LogSink
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, block: Event | None = None):
+        self.id = channel_id
+        self.block = block
+        self.sent: list[list[str | None]] = []
+
+    async def send(self, *, embeds: list[Embed]) -> None:
+        if self.block:
+            await self.block.wait()
+        self.sent.append([embed.title for embed in embeds])
+
+
+def test_entries_are_packed() -> None:
+    async def main() -> FakeChannel:
+        sink = LogSink(flush_interval=0.01)
+        channel = FakeChannel(1)
+        for i in range(12):
+            sink.log(channel, Embed(title=f"entry {i}", description="x"))  # type: ignore
+        await sleep(0.05)
+        return channel
+
+    sent = run(main()).sent
+    assert [len(message) for message in sent] == [10, 2]
+
+
+def test_close_sends_buffered_and_running_flushes() -> None:
+    async def main() -> tuple[FakeChannel, FakeChannel]:
+        sink = LogSink(flush_interval=3600, max_pending=2)
+        release = Event()
+        busy, idle = FakeChannel(1, release), FakeChannel(2)
+
+        # the first channel is flushed immediately, but sending blocks until close() has been called
+        for i in range(2):
+            sink.log(busy, Embed(title=f"busy {i}"))  # type: ignore
+        sink.log(idle, Embed(title="idle"))  # type: ignore
+        await sleep(0)
+
+        async def unblock() -> None:
+            await sleep(0.01)
+            release.set()
+
+        await gather(sink.close(), unblock())
+        return busy, idle
+
+    busy, idle = run(main())
+    assert busy.sent == [["busy 0", "busy 1"]]
+    assert idle.sent == [["idle"]]
@@ -0,0 +1,84 @@
+from asyncio import run
+from typing import AsyncIterator
+
+import pytest
+from discord import Embed
+
+from PyDrocsid.pagination import IteratorPageSource, LazyPageSource, ListPageSource, Paginator
+
+
+async def pages(count: int) -> AsyncIterator[Embed]:
+    for i in range(count):
+        yield Embed(title=str(i))
+
+
+def test_list_page_source() -> None:
+    source = ListPageSource([Embed(title="a"), Embed(title="b")])
+    assert len(source) == 2
+    assert run(source.get_page(1)).title == "b"
+
+
+def test_lazy_page_source_caches_pages() -> None:
+    rendered: list[int] = []
+
+    def render(page: int) -> Embed:
+        rendered.append(page)
+        return Embed(title=str(page))
+
+    async def main() -> None:
+        source = LazyPageSource(10, render, cache_size=2)
+        for page in [0, 1, 0, 2, 1]:
+            assert (await source.get_page(page)).title == str(page)
+        with pytest.raises(IndexError):
+            await source.get_page(10)
+
+    run(main())
+    assert rendered == [0, 1, 2, 1]
+
+
+def test_iterator_page_source() -> None:
+    async def main() -> None:
+        source = IteratorPageSource(3, pages(3))
+        assert (await source.get_page(2)).title == "2"
+        assert (await source.get_page(0)).title == "0"
+        with pytest.raises(IndexError):
+            await source.get_page(3)
+
+    run(main())
+
+
+def test_iterator_page_source_with_fewer_pages() -> None:
+    async def main() -> None:
+        source = IteratorPageSource(5, pages(2))
+        assert (await source.get_page(4)).title == "1"
+        assert len(source) == 2
+
+        empty = IteratorPageSource(3, pages(0))
+        assert (await empty.get_page(1)).title is None
+        assert len(empty) == 0
+
+    run(main())
+
+
+def test_button_click_is_acknowledged_before_rendering() -> None:
+    events: list[str] = []
+
+    def render(page: int) -> Embed:
+        events.append(f"render {page}")
+        return Embed(title=str(page))
+
+    class Response:
+        async def defer(self) -> None:
+            events.append("defer")
+
+    class Interaction:
+        response = Response()
+
+    async def main() -> None:
+        paginator = Paginator(LazyPageSource(3, render), timeout=60)
+        await paginator._get_page()
+        events.clear()
+        await paginator.buttons[3].callback(Interaction())  # type: ignore
+
+    run(main())
+    assert events == ["defer", "render 1"]
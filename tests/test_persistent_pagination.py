@@ -0,0 +1,188 @@
+from typing import Any
+
+from discord import Embed, InteractionType
+
+from PyDrocsid.pagination import PAGINATION_CUSTOM_ID, _create_persistent_pagination, handle_pagination_interaction
+from PyDrocsid.redis_client import cache
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+class FakeResponse:
+    def __init__(self, events: list[Any]):
+        self.events = events
+
+    async def defer(self) -> None:
+        self.events.append("defer")
+
+
+class FakeFollowup:
+    def __init__(self, events: list[Any]):
+        self.events = events
+
+    async def send(self, *args: Any, **kwargs: Any) -> None:
+        self.events.append(("send", args, kwargs))
+
+
+class FakeInteraction:
+    """Records the responses to a button click."""
+
+    def __init__(self, custom_id: str, user_id: int = 1, type_: InteractionType = InteractionType.component):
+        self.type = type_
+        self.data: dict[str, Any] | None = {"custom_id": custom_id}
+        self.user = FakeUser(user_id)
+        self.events: list[Any] = []
+        self.response = FakeResponse(self.events)
+        self.followup = FakeFollowup(self.events)
+
+    async def edit_original_response(self, **kwargs: Any) -> None:
+        self.events.append(("edit", kwargs))
+
+
+class FakeChannel:
+    """Captures the view of a sent persistent pagination."""
+
+    def __init__(self) -> None:
+        self.kwargs: dict[str, Any] = {}
+
+    async def send(self, **kwargs: Any) -> Any:
+        self.kwargs = kwargs
+
+
+async def create(pages: int, user_id: int = 1) -> dict[int, str]:
+    """Create a persistent pagination and return the custom ids of its buttons by target page."""
+
+    channel = FakeChannel()
+    await _create_persistent_pagination(
+        channel, FakeUser(user_id), [Embed(title=str(i)) for i in range(pages)]  # type: ignore
+    )
+    return {int(button.custom_id.split(":")[3]): button.custom_id for button in channel.kwargs["view"].children}
+
+
+def test_click_is_acknowledged_first(run: Any) -> None:
+    async def main() -> None:
+        custom_ids = await create(3)
+        interaction = FakeInteraction(custom_ids[1])
+        await handle_pagination_interaction(interaction)  # type: ignore
+
+        assert interaction.events[0] == "defer"
+        assert interaction.events[1][0] == "edit"
+        assert interaction.events[1][1]["embed"].title == "1"
+
+    run(main())
+
+
+def test_custom_id_encoding(run: Any) -> None:
+    async def main() -> None:
+        channel = FakeChannel()
+        await _create_persistent_pagination(
+            channel, FakeUser(42), [Embed(title=str(i)) for i in range(3)]  # type: ignore
+        )
+        buttons = channel.kwargs["view"].children
+
+        parts = [button.custom_id.split(":") for button in buttons]
+        assert [prefix for prefix, *_ in parts] == [PAGINATION_CUSTOM_ID] * 5
+        assert [slot for _, slot, *_ in parts] == ["0", "1", "2", "3", "4"]
+        assert len({source_id for _, _, source_id, *_ in parts}) == 1
+        assert [target for *_, target, _ in parts] == ["0", "-1", "-1", "1", "2"]
+        assert [user_id for *_, user_id in parts] == ["42"] * 5
+        assert [button.disabled for button in buttons] == [True, True, True, False, False]
+
+    run(main())
+
+
+def test_custom_id_decoding(run: Any) -> None:
+    async def main() -> None:
+        custom_ids = await create(3)
+
+        interaction = FakeInteraction(custom_ids[2])
+        await handle_pagination_interaction(interaction)  # type: ignore
+        _, kwargs = interaction.events[1]
+        assert kwargs["embed"].title == "2"
+
+        # the buttons of the new view point to the pages around the selected page
+        source_id = custom_ids[2].split(":")[2]
+        assert [button.custom_id for button in kwargs["view"].children] == [
+            f"{PAGINATION_CUSTOM_ID}:{slot}:{source_id}:{target}:1" for slot, target in enumerate([0, 1, -1, 3, 2])
+        ]
+        assert [button.disabled for button in kwargs["view"].children] == [False, False, True, True, True]
+
+    run(main())
+
+
+def test_out_of_range_page(run: Any) -> None:
+    async def main() -> None:
+        custom_ids = await create(3)
+        prefix, slot, source_id, _, user_id = custom_ids[1].split(":")
+
+        interaction = FakeInteraction(f"{prefix}:{slot}:{source_id}:3:{user_id}")
+        await handle_pagination_interaction(interaction)  # type: ignore
+
+        # the click is acknowledged, but the message is kept as it is
+        assert interaction.events == ["defer"]
+
+    run(main())
+
+
+def test_stale_pagination(run: Any) -> None:
+    async def main() -> None:
+        custom_ids = await create(3)
+        source_id = custom_ids[1].split(":")[2]
+        await cache.delete(f"pagination:{source_id}")
+
+        interaction = FakeInteraction(custom_ids[1])
+        await handle_pagination_interaction(interaction)  # type: ignore
+
+        # the buttons of expired paginations are removed
+        assert interaction.events == ["defer", ("edit", {"view": None})]
+
+        interaction = FakeInteraction(f"{PAGINATION_CUSTOM_ID}:1:unknown:1:1")
+        await handle_pagination_interaction(interaction)  # type: ignore
+        assert interaction.events == ["defer", ("edit", {"view": None})]
+
+    run(main())
+
+
+def test_click_of_other_user(run: Any) -> None:
+    async def main() -> None:
+        custom_ids = await create(3, user_id=1)
+
+        interaction = FakeInteraction(custom_ids[1], user_id=2)
+        await handle_pagination_interaction(interaction)  # type: ignore
+
+        # the original message is not edited, the other user gets their own pagination instead
+        assert interaction.events[0] == "defer"
+        (event, args, kwargs), *rest = interaction.events[1:]
+        assert event == "send" and not args and not rest
+        assert kwargs["ephemeral"]
+        assert kwargs["embed"].title == "1"
+        assert {button.custom_id.split(":")[4] for button in kwargs["view"].children} == {"2"}
+
+    run(main())
+
+
+def test_other_interactions_pass_through(run: Any) -> None:
+    async def main() -> None:
+        custom_ids = await create(3)
+        source_id = custom_ids[1].split(":")[2]
+
+        interactions = [
+            FakeInteraction("other:0:abc:1:1"),
+            FakeInteraction(f"{PAGINATION_CUSTOM_ID}:1:{source_id}:x:1"),
+            FakeInteraction(f"{PAGINATION_CUSTOM_ID}:1:{source_id}:-1:1"),
+            FakeInteraction(f"{PAGINATION_CUSTOM_ID}:1:{source_id}:1"),
+            FakeInteraction(""),
+            FakeInteraction(custom_ids[1], type_=InteractionType.application_command),
+        ]
+        no_data = FakeInteraction(custom_ids[1])
+        no_data.data = None
+        interactions.append(no_data)
+
+        for interaction in interactions:
+            await handle_pagination_interaction(interaction)  # type: ignore
+            assert interaction.events == []
+
+    run(main())
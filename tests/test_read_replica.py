@@ -0,0 +1,42 @@
+import os
+from tempfile import mkdtemp
+from typing import Any
+
+from sqlalchemy import BigInteger, Column, Integer, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from PyDrocsid.database import Base, db, db_context, filter_by, select
+from PyDrocsid.database.database import Replica
+
+
+class Item(Base):
+    __tablename__ = "test_read_replica_item"
+
+    id = Column(BigInteger, primary_key=True)
+    value = Column(Integer)
+
+
+def test_core_write_pins_session_to_primary(run: Any, monkeypatch: Any) -> None:
+    replica = Replica(create_async_engine(f"sqlite+aiosqlite:///{os.path.join(mkdtemp(), 'replica.db')}"))
+    monkeypatch.setattr(db, "replicas", [replica])
+
+    async def main() -> None:
+        # the replica has not received any changes yet
+        for engine, value in [(db.engine, 1), (replica.engine, 0)]:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all, tables=[Item.__table__])
+                await conn.run_sync(Base.metadata.create_all, tables=[Item.__table__])
+                await conn.execute(Item.__table__.insert().values(id=1, value=value))
+
+        try:
+            async with db_context():
+                assert await db.first(select(Item.value)) == 0
+
+            async with db_context():
+                await db.exec(update(Item).values(value=2))
+                assert await db.first(select(Item.value)) == 2
+                assert await db.exists(filter_by(Item, value=2))
+        finally:
+            await replica.engine.dispose()
+
+    run(main())
@@ -0,0 +1,69 @@
+from asyncio import sleep
+from datetime import timedelta
+from typing import Any
+
+from discord.utils import time_snowflake, utcnow
+
+from PyDrocsid.command_edit import RESPONSE_LINK_CHANNEL, ResponseLinkFilter, _response_key
+from PyDrocsid.redis_client import cache, pipeline
+
+
+async def wait_for(condition: Any) -> None:
+    for _ in range(200):
+        if condition():
+            return
+        await sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+async def link_on_other_node(channel_id: int, message_id: int) -> None:
+    async with pipeline() as pipe:
+        pipe.lpush(key := _response_key(channel_id, message_id), "1")
+        pipe.publish(RESPONSE_LINK_CHANNEL, key)
+
+
+def test_filter_falls_back_to_redis_until_warm(run: Any) -> None:
+    old = time_snowflake(utcnow() - timedelta(hours=1))
+
+    async def main() -> None:
+        await cache.flushdb()
+        # link created before the filter was started
+        await cache.lpush(_response_key(1, old + 1), "1")
+
+        response_filter = ResponseLinkFilter(1000, 3600, 60)
+        try:
+            assert response_filter.might_have_responses(1, old)
+            await wait_for(lambda: response_filter._ready)
+
+            assert not response_filter.might_have_responses(1, old)
+            assert response_filter.might_have_responses(1, old + 1)
+        finally:
+            if response_filter._task:
+                response_filter._task.cancel()
+
+    run(main())
+
+
+def test_link_announced_by_other_node(run: Any) -> None:
+    old = time_snowflake(utcnow() - timedelta(hours=1))
+    recent = time_snowflake(utcnow())
+
+    async def main() -> None:
+        await cache.flushdb()
+        response_filter = ResponseLinkFilter(1000, 3600, 60)
+        try:
+            response_filter.might_have_responses(1, old)
+            await wait_for(lambda: response_filter._ready)
+            assert not response_filter.might_have_responses(1, old)
+
+            # links of recent messages are looked up in redis, even if their announcement has not arrived yet
+            assert response_filter.might_have_responses(2, recent)
+
+            await link_on_other_node(1, old)
+            await wait_for(lambda: response_filter.might_have_responses(1, old))
+            assert not response_filter.might_have_responses(2, old)
+        finally:
+            if response_filter._task:
+                response_filter._task.cancel()
+
+    run(main())
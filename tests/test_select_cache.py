@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, relationship
+
+from PyDrocsid.database import Base, filter_by, select
+
+
+class Parent(Base):
+    __tablename__ = "test_select_cache_parent"
+
+    id = Column(BigInteger, primary_key=True)
+    kind = Column(Integer)
+    children: Mapped[list[Child]] = relationship("Child")
+
+
+class Child(Base):
+    __tablename__ = "test_select_cache_child"
+
+    id = Column(BigInteger, primary_key=True)
+    parent_id = Column(BigInteger, ForeignKey("test_select_cache_parent.id"))
+    toys: Mapped[list[Toy]] = relationship("Toy")
+
+
+class Toy(Base):
+    __tablename__ = "test_select_cache_toy"
+
+    id = Column(BigInteger, primary_key=True)
+    child_id = Column(BigInteger, ForeignKey("test_select_cache_child.id"))
+
+
+# relationship paths can be passed as lists or tuples (typed as Any, as the helpers are annotated with Column)
+LIST_PATH: Any = [Parent.children, Child.toys]
+TUPLE_PATH: Any = (Parent.children, Child.toys)
+
+
+def test_equivalent_load_paths_share_statement() -> None:
+    statement = select(Parent, LIST_PATH)
+    assert select(Parent, TUPLE_PATH) is statement
+    fresh_list: Any = list(TUPLE_PATH)
+    assert select(Parent, fresh_list) is statement
+    assert select(Parent, Parent.children) is select(Parent, Parent.children)
+
+    # different paths must not share a statement
+    assert select(Parent, Parent.children) is not statement
+    assert select(Parent) is not select(Parent, Parent.children)
+
+
+def test_cached_statement_is_not_mutated() -> None:
+    statement = select(Parent, LIST_PATH)
+    sql = str(statement)
+
+    # callers derive new statements from the shared one
+    filtered = filter_by(Parent, LIST_PATH, id=1, kind=2)
+    statement.where(Parent.id == 3).order_by(Parent.kind).limit(1)
+    filter_by(Parent, TUPLE_PATH, id=4)
+
+    assert select(Parent, LIST_PATH) is statement
+    assert str(statement) == sql
+    assert "WHERE" not in sql and "WHERE" in str(filtered)
+
+
+def test_filter_values_are_bound_parameters() -> None:
+    first, second = filter_by(Parent, id=1), filter_by(Parent, id=2)
+    assert str(first) == str(second)
+    assert first.compile().params == {"id_1": 1}
+    assert second.compile().params == {"id_1": 2}
@@ -0,0 +1,111 @@
+import sys
+from asyncio import Event, create_task, gather, sleep
+from typing import Any
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from PyDrocsid.cog import Cog
+from PyDrocsid.config import Config
+from PyDrocsid.database import db, db_context, db_wrapper
+from PyDrocsid.pubsub import PubSubChannel
+
+
+channel: PubSubChannel[[int], tuple[int, AsyncSession, AsyncSession]] = PubSubChannel()
+
+
+@db_wrapper
+async def nested() -> AsyncSession:
+    await sleep(0)
+    return db.session
+
+
+class SessionCog(Cog):
+    @channel.subscribe
+    async def first(self, delay: int) -> tuple[int, AsyncSession, AsyncSession]:
+        session = db.session
+        inner = await nested()
+        await sleep(delay * 0.01)
+
+        # the nested db_wrapper must not affect the session of this subscription
+        assert db.session is session
+        return 1, session, inner
+
+    @channel.subscribe
+    async def second(self, delay: int) -> tuple[int, AsyncSession, AsyncSession]:
+        session = db.session
+        await sleep(delay * 0.02)
+        inner = await nested()
+        assert db.session is session
+        return 2, session, inner
+
+
+@pytest.fixture(autouse=True)
+def cog(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Config, "ENABLED_COG_PACKAGES", {sys.modules[__name__].__package__})
+    SessionCog()
+
+
+def test_no_session() -> None:
+    with pytest.raises(RuntimeError):
+        db.session
+
+
+def test_nested_db_wrapper(run: Any) -> None:
+    async def main() -> None:
+        async with db_context():
+            outer = db.session
+            inner = await nested()
+            assert inner is not outer
+            assert db.session is outer
+
+        with pytest.raises(RuntimeError):
+            db.session
+
+    run(main())
+
+
+def test_subscriptions_have_isolated_sessions(run: Any) -> None:
+    async def main() -> None:
+        async with db_context():
+            outer = db.session
+            results = sorted(await channel.publish(1))
+            assert db.session is outer
+
+        sessions = [session for _, session, inner in results] + [inner for _, session, inner in results]
+        assert [x for x, *_ in results] == [1, 2]
+        assert len({id(session) for session in [outer, *sessions]}) == 5
+
+    run(main())
+
+
+def test_concurrent_tasks(run: Any) -> None:
+    async def main() -> None:
+        closed = Event()
+
+        async def child() -> AsyncSession:
+            # the child inherits the session of its parent, but pushing and popping sessions is isolated
+            inherited = db.session
+            assert await nested() is not inherited
+            assert db.session is inherited
+            await closed.wait()
+            assert db.session is inherited
+            return inherited
+
+        async with db_context():
+            outer = db.session
+            tasks = [create_task(child()) for _ in range(5)]
+            await sleep(0.01)
+            assert db.session is outer
+
+        # the parent context has been closed, the children still see their own stack
+        with pytest.raises(RuntimeError):
+            db.session
+        closed.set()
+        assert all(session is outer for session in await gather(*tasks))
+
+        # independent tasks with their own contexts get their own sessions
+        sessions = await gather(*[nested() for _ in range(5)])
+        assert len({id(session) for session in sessions}) == 5
+
+    run(main())
@@ -0,0 +1,14 @@
+from typing import Any
+
+from PyDrocsid import http_client
+from PyDrocsid.shutdown import close_resources
+
+
+def test_close_resources_closes_http_session(run: Any) -> None:
+    async def main() -> None:
+        session = http_client.get_session()
+        await close_resources()
+        assert session.closed
+        assert http_client._session is None
+
+    run(main())
@@ -0,0 +1,57 @@
+import random
+import re
+
+import pytest
+
+from PyDrocsid.embeds import iter_split_lines, split_lines
+
+
+def strip_separators(text: str) -> str:
+    return re.sub("[ \n]", "", text)
+
+
+def test_no_separators() -> None:
+    assert split_lines("abcdefgh", 3) == ["abc", "def", "gh"]
+    assert split_lines("abcdef", 3) == ["abc", "def"]
+    assert len(split_lines("x" * 1_000_000, 1024)) == 977
+
+
+def test_separator_at_limit() -> None:
+    # the separator directly after the first max_size characters is used
+    assert split_lines("abc def", 3) == ["abc", "def"]
+    assert split_lines("abc\ndef", 3) == ["abc", "def"]
+    assert split_lines("abcd efg", 3) == ["abc", "d", "efg"]
+
+
+def test_separator_priority() -> None:
+    assert split_lines("a. b c\nd e f", 7) == ["a. b c", "d e f"]
+    # the dot stays in the first substring
+    assert split_lines("ab. cd ef", 5) == ["ab.", "cd ef"]
+    assert split_lines("ab cd ef", 5) == ["ab cd", "ef"]
+
+
+def test_first_max_size() -> None:
+    assert split_lines("aaa bbb ccc", 7, first_max_size=3) == ["aaa", "bbb ccc"]
+    assert split_lines("abcdefgh", 5, first_max_size=2) == ["ab", "cdefg", "h"]
+
+
+def test_strip() -> None:
+    assert split_lines("", 3) == []
+    assert split_lines(" \n \n", 3) == []
+    assert split_lines("  ab \n\n\n cd  ", 3) == ["ab", "cd"]
+
+
+def test_lazy() -> None:
+    chunks = iter_split_lines("a" * 10_000_000 + " b", 10)
+    assert next(chunks) == "a" * 10
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_text(seed: int) -> None:
+    rnd = random.Random(seed)
+    text = "".join(rnd.choices("ab. \n", weights=[10, 10, 1, 3, 1], k=rnd.randint(0, 5000)))
+    max_size = rnd.randint(1, 100)
+    chunks = split_lines(text, max_size)
+
+    assert all(0 < len(chunk) <= max_size and chunk == chunk.strip(" \n") for chunk in chunks)
+    assert strip_separators("".join(chunks)) == strip_separators(text)
@@ -0,0 +1,131 @@
+import logging
+from asyncio import Event, create_task, gather, sleep
+from typing import Any
+
+from sqlalchemy import BigInteger, Column, Integer, String
+
+from PyDrocsid.database import Base, db, db_context, select
+from PyDrocsid.database.write_behind import PendingUpdate, WriteBehindBuffer
+
+
+class Counter(Base):
+    __tablename__ = "test_write_behind_counter"
+
+    id = Column(BigInteger, primary_key=True)
+    name = Column(String(32))
+    value = Column(Integer, default=0)
+
+
+async def setup() -> None:
+    async with db.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all, tables=[Counter.__table__])
+        await conn.run_sync(Base.metadata.create_all, tables=[Counter.__table__])
+
+
+async def get_rows() -> dict[int, tuple[str | None, int]]:
+    async with db_context():
+        return {row.id: (row.name, row.value) for row in await db.all(select(Counter))}
+
+
+def test_merge() -> None:
+    pending = PendingUpdate(increments={"value": 2})
+    pending.merge(PendingUpdate(increments={"value": 3}))
+    assert (pending.values, pending.increments) == ({}, {"value": 5})
+
+    # a newer value replaces pending increments, later increments are added to the value
+    pending.merge(PendingUpdate(values={"value": 10, "name": "a"}))
+    pending.merge(PendingUpdate(increments={"value": 1}))
+    assert (pending.values, pending.increments) == ({"value": 11, "name": "a"}, {})
+
+
+def test_set_and_increment_are_coalesced(run: Any) -> None:
+    async def main() -> None:
+        await setup()
+        buffer = WriteBehindBuffer(db, flush_interval=3600)
+        for _ in range(5):
+            buffer.increment(Counter, {"id": 1}, value=1)
+        buffer.set(Counter, {"id": 1}, name="a")
+        buffer.set(Counter, {"id": 2}, name="b", value=7)
+        buffer.set(Counter, {"id": 2}, name="c")
+        assert len(buffer) == 2
+
+        assert await get_rows() == {}
+        await buffer.flush()
+        assert len(buffer) == 0
+        assert await get_rows() == {1: ("a", 5), 2: ("c", 7)}
+
+        # existing rows are updated in place
+        buffer.increment(Counter, {"id": 1}, value=2)
+        await buffer.close()
+        assert await get_rows() == {1: ("a", 7), 2: ("c", 7)}
+
+    run(main())
+
+
+def test_max_size_triggers_flush(run: Any) -> None:
+    async def main() -> None:
+        await setup()
+        buffer = WriteBehindBuffer(db, flush_interval=3600, max_size=3)
+        for i in range(3):
+            buffer.set(Counter, {"id": i}, value=i)
+        await sleep(0.1)
+        assert len(buffer) == 0
+        assert await get_rows() == {0: (None, 0), 1: (None, 1), 2: (None, 2)}
+        await buffer.close()
+
+    run(main())
+
+
+def test_close_waits_for_running_flush(run: Any) -> None:
+    async def main() -> None:
+        await setup()
+        buffer = WriteBehindBuffer(db, flush_interval=0)
+        started, proceed = Event(), Event()
+        write = buffer._write
+
+        async def slow_write(*args: Any) -> None:
+            started.set()
+            await proceed.wait()
+            await write(*args)
+
+        buffer._write = slow_write  # type: ignore
+        buffer.increment(Counter, {"id": 1}, value=1)
+
+        # close the buffer while the periodic flush is writing the row
+        await started.wait()
+        close = create_task(buffer.close())
+        await sleep(0.01)
+        proceed.set()
+        await close
+
+        assert len(buffer) == 0
+        assert await get_rows() == {1: (None, 1)}
+
+    run(main())
+
+
+def test_cancelled_flush_keeps_updates(run: Any, caplog: Any) -> None:
+    async def main() -> None:
+        await setup()
+        buffer = WriteBehindBuffer(db, flush_interval=3600)
+        started = Event()
+
+        async def blocking_write(*_: Any) -> None:
+            started.set()
+            await Event().wait()
+
+        buffer._write = blocking_write  # type: ignore
+        buffer.increment(Counter, {"id": 1}, value=1)
+        flush = create_task(buffer.flush())
+        await started.wait()
+        buffer.increment(Counter, {"id": 1}, value=2)
+        flush.cancel()
+        await gather(flush, return_exceptions=True)
+
+        # a cancellation is not an error, and the rows are kept for the next flush
+        assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+        del buffer._write
+        await buffer.close()
+        assert await get_rows() == {1: (None, 3)}
+
+    run(main())